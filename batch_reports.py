@@ -0,0 +1,168 @@
+""" Generates status reports for many projects without the Streamlit form.
+
+Reads project records from a CSV or JSONL file, builds the same Green,
+Yellow and Red prompts as the page and calls Bedrock from a bounded thread
+pool. Each result is written as a JSON line as soon as it completes.
+
+    python batch_reports.py projects.csv --workers 8 --rate 2 -o reports.jsonl
+
+Record fields match the form: project_name, status (green/yellow/red),
+executive_summary, project_activities_this_week, project_activities_next_week,
+project_risk, project_margin, project_open_ehi_flags, reason, and optionally
+project_target_date and project_status_this_week.
+"""
+import argparse
+import csv
+import json
+import logging
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from botocore.exceptions import ClientError
+
+from bedrock_wrapper import PARAMS
+from model_router import ModelRouter
+from prompts import build_prompt
+from response_cache import get_response_cache
+from telemetry import THROTTLING_ERRORS
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """ Thread-safe token bucket limiting calls to rate per second """
+
+    def __init__(self, rate, capacity=None):
+        """ Starts with a full bucket of capacity tokens """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Blocks until a token is available and takes it """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def positive(kind):
+    """ Returns an argparse type that parses kind and rejects values <= 0 """
+    def parse(value):
+        number = kind(value)
+        if number <= 0:
+            raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+        return number
+    return parse
+
+
+def read_records(path):
+    """ Loads project records from a .csv or .jsonl file """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def invoke_with_backoff(bedrock, body, status=None, max_retries=6, base_delay=1.0, max_delay=30.0):
+    """ Calls the model, backing off exponentially while Bedrock throttles """
+    for attempt in range(max_retries + 1):
+        try:
+            return bedrock.invoke_model(body, status), attempt
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            if code not in THROTTLING_ERRORS or attempt == max_retries:
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.warning("Throttled (%s), retrying in %.1fs", code, delay)
+            time.sleep(delay)
+
+
+def generate_report(record, bedrock, cache, force_regenerate=False):
+    """ Generates the summary for one record and returns its output line """
+    start = time.perf_counter()
+    result = {'project_name': record.get('project_name'), 'status': record.get('status')}
+    try:
+        body = bedrock.generate_body(build_prompt(record), PARAMS)
+        key = cache.make_key(bedrock.cache_model_id(body, record.get('status')), body, PARAMS)
+        summary = None if force_regenerate else cache.get(key)
+        result['cached'] = summary is not None
+        if summary is None:
+            summary, result['retries'] = invoke_with_backoff(bedrock, body, record.get('status'))
+            if summary:
+                cache.set(key, summary)
+        result['summary'] = summary
+    except Exception as e:
+        # Record every failure as its own output line so one bad item never aborts the batch
+        logger.warning("Report for %s failed: %r", record.get('project_name'), e)
+        result['error'] = f'{type(e).__name__}: {e}'
+    result['latency_s'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(records, output, workers=4, rate=1.0, force_regenerate=False):
+    """ Generates every report on a bounded pool, writing lines as they complete """
+    # The router takes a token for every model call, fallbacks included; hedging
+    # would only spend quota, since a batch is bound by throughput, not latency
+    bedrock = ModelRouter(hedging=False, limiter=TokenBucket(rate))
+    cache = get_response_cache()
+    latencies = []
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(generate_report, record, bedrock, cache, force_regenerate)
+            for record in records
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            latencies.append(result['latency_s'])
+            failures += 'error' in result
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+    wall_time = time.perf_counter() - start
+    return {
+        'reports': len(records),
+        'failures': failures,
+        'wall_time_s': round(wall_time, 3),
+        'latency_p50_s': round(statistics.median(latencies), 3) if latencies else None,
+        'latency_p95_s': round(statistics.quantiles(latencies, n=20, method='inclusive')[-1], 3) if len(latencies) > 1 else None,
+        'latency_max_s': max(latencies, default=None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help='CSV or JSONL file of project records')
+    parser.add_argument('-o', '--output', help='JSONL file to write (default: stdout)')
+    parser.add_argument('--workers', type=positive(int), default=4, help='concurrent Bedrock calls')
+    parser.add_argument('--rate', type=positive(float), default=1.0, help='max Bedrock calls per second')
+    parser.add_argument('--force-regenerate', action='store_true', help='ignore cached summaries')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    records = read_records(args.input)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        stats = run_batch(records, output, args.workers, args.rate, args.force_regenerate)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    logger.info("Batch finished: %s", json.dumps(stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import atexit
+import json
+import os
+import threading
+
+from telemetry import get_telemetry
+
+#BEDROCK PART
+# Fetch AWS credentials from environment variables
+AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
+AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
+AWS_REGION = os.environ.get('AWS_REGION', 'us-west-2')
+
+# Model and sampling parameters used for every status report
+MODEL_ID = 'anthropic.claude-v2'
+PARAMS = {
+    "max_tokens_to_sample": 1000,
+    "temperature": 0.1,
+    "top_p": 0.1,
+}
+# Week-over-week updates only rewrite the changed sections
+DELTA_PARAMS = dict(PARAMS, max_tokens_to_sample=500)
+
+# Connection pool and retry settings shared by every Bedrock client
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.environ.get('BEDROCK_MAX_POOL_CONNECTIONS', 50))
+BEDROCK_MAX_ATTEMPTS = int(os.environ.get('BEDROCK_MAX_ATTEMPTS', 5))
+# Build the shared client in the background once the page has rendered
+BEDROCK_PREWARM = os.environ.get('BEDROCK_PREWARM', '1') == '1'
+
+def bedrock_config():
+    """ Returns the botocore Config for Bedrock clients; imports botocore lazily """
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=5,
+        read_timeout=120,
+        retries={
+            'max_attempts': BEDROCK_MAX_ATTEMPTS,
+            'mode': 'adaptive',
+        },
+    )
+
+class BedrockWrapper:
+  
+    def __init__(self, service, region, config=None, session=None):
+        """ Initiates the bedrock client and runtime """
+        import boto3
+
+        session = session or boto3.session.Session()
+        self.bedrock_client = session.client(service_name=service, region_name=region, config=config)
+        self.bedrock_runtime = session.client('bedrock-runtime', region_name=region, config=config)
+        self.telemetry = get_telemetry()
+
+    def list_foundation_models(self):
+        """ List the foundational models available """
+        response = self.bedrock_client.list_foundation_models()
+        models = response["modelSummaries"]
+        print(f"Got {len(models)} foundation models.", models)
+
+    def set_model(self, model_id):
+        """ Sets the generative AI model ID to be used """
+        self.model_id = model_id
+
+    def generate_body(self, prompt, params):
+        """ Sets model parameters and prompt """
+        body = json.dumps({
+            'prompt': prompt,
+            **params
+        })
+        return body
+
+    def invoke_model(self, body, status=None, model_id=None):
+        """ Calls the model and gets response string; model_id overrides the model set for this call """
+        accept = 'application/json'
+        contentType = 'application/json'
+        model_id = model_id or self.model_id
+        with self.telemetry.track(model_id, json.loads(body).get('prompt', ''), status) as call:
+            response = self.bedrock_runtime.invoke_model(
+                body=body, modelId=model_id, 
+                accept=accept, contentType=contentType
+            )
+            call.first_token()
+            call.response(response)
+            response_body = json.loads(response['body'].read())
+            result = response_body.get('completion')
+        return result
+
+    def invoke_model_stream(self, body, status=None, model_id=None):
+        """ Calls the model and yields the response string chunk by chunk; model_id overrides the model set for this call.
+
+        Returns the stop reason, e.g. 'max_tokens' when the completion was cut off.
+        """
+        accept = 'application/json'
+        contentType = 'application/json'
+        model_id = model_id or self.model_id
+        with self.telemetry.track(model_id, json.loads(body).get('prompt', ''), status) as call:
+            response = self.bedrock_runtime.invoke_model_with_response_stream(
+                body=body, modelId=model_id,
+                accept=accept, contentType=contentType
+            )
+            call.response(response)
+            stop_reason = None
+            for event in response['body']:
+                chunk = event.get('chunk')
+                if chunk:
+                    payload = json.loads(chunk['bytes'])
+                    metrics = payload.get('amazon-bedrock-invocationMetrics')
+                    if metrics:
+                        call.tokens(metrics.get('inputTokenCount'), metrics.get('outputTokenCount'))
+                    stop_reason = payload.get('stop_reason') or stop_reason
+                    completion = payload.get('completion', '')
+                    if completion:
+                        call.first_token()
+                    yield completion
+        return stop_reason
+
+    def close(self):
+        """ Closes the pooled connections of both clients """
+        self.bedrock_client.close()
+        self.bedrock_runtime.close()
+
+
+# Process-wide client, shared by every Streamlit session and script rerun
+_bedrock = None
+_bedrock_lock = threading.Lock()
+_prewarm_thread = None
+
+def get_bedrock():
+    """ Returns the shared BedrockWrapper, building it on first use """
+    global _bedrock
+    if _bedrock is None:
+        with _bedrock_lock:
+            if _bedrock is None:
+                bedrock = BedrockWrapper("bedrock", AWS_REGION, config=bedrock_config())
+                bedrock.set_model(MODEL_ID)
+                _bedrock = bedrock
+    return _bedrock
+
+def prewarm_bedrock():
+    """ Builds the shared BedrockWrapper in a background thread if it does not exist yet """
+    global _prewarm_thread
+    if _bedrock is not None or not BEDROCK_PREWARM:
+        return
+    with _bedrock_lock:
+        if _prewarm_thread is not None:
+            return
+        _prewarm_thread = threading.Thread(target=get_bedrock, name='bedrock-prewarm', daemon=True)
+    _prewarm_thread.start()
+
+def close_bedrock():
+    """ Closes the shared BedrockWrapper; the next get_bedrock() builds a new one """
+    global _bedrock
+    with _bedrock_lock:
+        if _bedrock is not None:
+            _bedrock.close()
+            _bedrock = None
+
+def refresh_bedrock():
+    """ Rebuilds the shared BedrockWrapper, e.g. after rotating credentials """
+    close_bedrock()
+    return get_bedrock()
+
+atexit.register(close_bedrock)
@@ -0,0 +1,74 @@
+""" Measures cold start: module import time and the first page paint.
+
+Each sample runs in a fresh interpreter, like a new container would:
+
+- import: time to import bedrock_wrapper, and whether boto3 got loaded
+- first_paint: time of the first AppTest run of the page, with no AWS
+  credentials and pre-warming disabled
+
+    python benchmarks/cold_start.py --root path/to/older/checkout
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import bedrock_wrapper
+print(json.dumps({'seconds': time.perf_counter() - start, 'boto3_loaded': 'boto3' in sys.modules}))
+"""
+
+FIRST_PAINT_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+start = time.perf_counter()
+at.run()
+print(json.dumps({'seconds': time.perf_counter() - start, 'boto3_loaded': 'boto3' in sys.modules,
+                  'exception': bool(at.exception)}))
+"""
+
+
+def probe(code, root, runs, *args):
+    """ Runs code in runs fresh interpreters and collects its JSON output """
+    env = {k: v for k, v in os.environ.items() if not k.startswith('AWS_')}
+    env.update(BEDROCK_PREWARM='0', PYTHONPATH=root)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, '-c', code, *args], cwd=root, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    seconds = [s['seconds'] for s in samples]
+    return {
+        'runs': runs,
+        'median_ms': round(statistics.median(seconds) * 1000, 3),
+        'max_ms': round(max(seconds) * 1000, 3),
+        'boto3_loaded': samples[-1]['boto3_loaded'],
+        **({'exception': samples[-1]['exception']} if 'exception' in samples[-1] else {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--root', default=ROOT, help='checkout to measure (default: this one)')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    script = os.path.join(args.root, 'streamlit_test_fab.py')
+    print(json.dumps({
+        'root': args.root,
+        'import': probe(IMPORT_PROBE, args.root, args.runs),
+        'first_paint': probe(FIRST_PAINT_PROBE, args.root, args.runs, script),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+""" Measures the Bedrock client setup cost paid on every Streamlit rerun.
+
+Before: each rerun built a new BedrockWrapper (two boto3 clients).
+After: each rerun fetches the process-wide client from get_bedrock().
+
+Client construction needs no credentials or network, so this runs offline.
+It does not include the TLS handshake a fresh client pays on its first call.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bedrock_wrapper import AWS_REGION, BedrockWrapper, bedrock_config, get_bedrock
+
+
+def measure(fn, runs):
+    """ Returns per-call timings of fn in milliseconds """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+
+    before = measure(lambda: BedrockWrapper("bedrock", AWS_REGION, config=bedrock_config()), args.runs)
+    get_bedrock()
+    after = measure(get_bedrock, args.runs)
+
+    for label, timings in (("per-rerun client (before)", before), ("shared client (after)", after)):
+        print(f"{label:28} median {statistics.median(timings):9.3f} ms   max {max(timings):9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
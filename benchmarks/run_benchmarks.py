@@ -0,0 +1,245 @@
+""" Offline performance benchmarks against a stub Bedrock runtime.
+
+Measures Streamlit rerun time for the Green/Yellow/Red forms, the
+generate_body/invoke_model overhead, cache hit paths and concurrent
+throughput at N simultaneous sessions. Results are written as JSON so runs
+from different commits can be compared:
+
+    python benchmarks/run_benchmarks.py -o before.json
+    python benchmarks/run_benchmarks.py -o after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_runtime import StubBedrockRuntime, install_stub
+
+from bedrock_wrapper import PARAMS
+from generation_jobs import get_job_executor
+from model_router import get_router
+from prompts import build_prompt
+from response_cache import ResponseCache
+
+SCRIPT = os.path.join(ROOT, 'streamlit_test_fab.py')
+STATUSES = ("Green 🟢", "Yellow 🟡", "Red 🔴")
+
+
+def summarize(timings):
+    """ Returns median/p95/max of timings in milliseconds """
+    ordered = sorted(timings)
+    if not ordered:
+        return {'runs': 0}
+    return {
+        'runs': len(ordered),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def sample_record(status, i=0):
+    """ Returns a project record like the form would submit """
+    return {
+        'project_name': f'Project {i}',
+        'status': status,
+        'executive_summary': 'Migration of 40 applications to AWS. ' * 5,
+        'project_target_date': '2024-12-15',
+        'project_status_this_week': 'At Risk',
+        'project_activities_this_week': 'Landing zone deployed; wave 1 cutover rehearsal.',
+        'project_activities_next_week': 'Wave 1 cutover; start wave 2 discovery.',
+        'project_risk': 'DBA attrition may delay code conversion.',
+        'project_margin': '-3 percentage points',
+        'project_open_ehi_flags': 'DSR review pending',
+        'reason': 'Customer - Readiness',
+    }
+
+
+def bench_rerun(runs):
+    """ Times a script rerun with each status form displayed """
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for status in STATUSES:
+        at = AppTest.from_file(SCRIPT, default_timeout=60).run()
+        at.selectbox[0].select(status).run()
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            at.run()
+            timings.append(time.perf_counter() - start)
+        results[status.split()[0].lower()] = summarize(timings)
+    return results
+
+
+def bench_invoke_overhead(bedrock, runs):
+    """ Times generate_body and invoke_model through the router against a zero-latency stub """
+    prompt = build_prompt(sample_record('red'))
+    body_timings, invoke_timings, stream_timings = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        body = bedrock.generate_body(prompt, PARAMS)
+        body_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        bedrock.invoke_model(body)
+        invoke_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in bedrock.invoke_model_stream(body):
+            pass
+        stream_timings.append(time.perf_counter() - start)
+    return {
+        'generate_body': summarize(body_timings),
+        'invoke_model': summarize(invoke_timings),
+        'invoke_model_stream': summarize(stream_timings),
+    }
+
+
+def bench_cache(bedrock, runs):
+    """ Times memory hits, disk hits and misses of the response cache """
+    body = bedrock.generate_body(build_prompt(sample_record('yellow')), PARAMS)
+    summary = 'lorem ipsum ' * 300
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'responses.sqlite3')
+        cache = ResponseCache(path)
+        key = cache.make_key(bedrock.cache_model_id(body), body, PARAMS)
+        cache.set(key, summary)
+        memory, disk, miss = [], [], []
+        for i in range(runs):
+            start = time.perf_counter()
+            cache.get(key)
+            memory.append(time.perf_counter() - start)
+            cold = ResponseCache(path)
+            start = time.perf_counter()
+            cold.get(key)
+            disk.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            cache.get(cache.make_key(bedrock.cache_model_id(body), body + str(i), PARAMS))
+            miss.append(time.perf_counter() - start)
+    return {'memory_hit': summarize(memory), 'disk_hit': summarize(disk), 'miss': summarize(miss)}
+
+
+def bench_concurrency(bedrock, sessions, requests_per_session):
+    """ Streams distinct reports from N simultaneous sessions through the shared job executor """
+    jobs = get_job_executor()
+
+    def session(n):
+        timings = []
+        for i in range(requests_per_session):
+            record = sample_record(STATUSES[i % 3], n * 1000 + i)
+            body = bedrock.generate_body(build_prompt(record), PARAMS)
+            key = ResponseCache.make_key(bedrock.cache_model_id(body, record['status']), body, PARAMS)
+            start = time.perf_counter()
+            job = jobs.submit(key, lambda: bedrock.invoke_model_stream(body, record['status']))
+            # Poll like the page does, until the first chunk shows up
+            while not job.chunks and not job.done():
+                time.sleep(0.001)
+            first_token = time.perf_counter() - start
+            job.wait()
+            if job.error is not None:
+                timings.append(None)
+                continue
+            timings.append((first_token, time.perf_counter() - start))
+        return timings
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        outcomes = [t for timings in executor.map(session, range(sessions)) for t in timings]
+    wall_time = time.perf_counter() - start
+    results = [t for t in outcomes if t is not None]
+    return {
+        'sessions': sessions,
+        'requests': len(outcomes),
+        'failures': len(outcomes) - len(results),
+        'wall_time_s': round(wall_time, 3),
+        'requests_per_s': round(len(results) / wall_time, 2),
+        'first_token': summarize([r[0] for r in results]),
+        'latency': summarize([r[1] for r in results]),
+    }
+
+
+def git_commit():
+    """ Returns the current commit hash, or None outside a git checkout """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=''):
+    """ Flattens nested results into {'a.b.median_ms': value} """
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        elif isinstance(value, (int, float)):
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def compare(baseline, results):
+    """ Prints the change of every timing metric against a baseline run """
+    old, new = flatten(baseline['results']), flatten(results['results'])
+    print(f"Compared with {baseline.get('commit')}:", file=sys.stderr)
+    for key in sorted(new):
+        if key.endswith('_ms') and old.get(key):
+            change = (new[key] - old[key]) / old[key] * 100
+            print(f"  {key:55} {old[key]:10.3f} -> {new[key]:10.3f} ms ({change:+.1f}%)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-o', '--output', help='JSON file to write (default: stdout)')
+    parser.add_argument('--compare', help='earlier JSON result to compare against')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.2, help='stub time to first byte (s)')
+    parser.add_argument('--chunk-interval', type=float, default=0.01, help='stub gap between stream chunks (s)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of stub calls throttled')
+    parser.add_argument('--sessions', type=int, default=8, help='simultaneous sessions for the throughput run')
+    parser.add_argument('--skip-rerun', action='store_true', help='skip the Streamlit rerun benchmark')
+    args = parser.parse_args()
+
+    results = {}
+    install_stub(StubBedrockRuntime())
+    bedrock = get_router()
+    if not args.skip_rerun:
+        results['rerun'] = bench_rerun(args.runs)
+    results['invoke_overhead'] = bench_invoke_overhead(bedrock, args.runs)
+    results['cache'] = bench_cache(bedrock, args.runs)
+
+    runtime = StubBedrockRuntime(args.latency, args.chunk_interval, throttle_rate=args.throttle_rate)
+    install_stub(runtime)
+    bedrock = get_router()
+    try:
+        results['concurrency'] = bench_concurrency(bedrock, args.sessions, 3)
+    finally:
+        results.setdefault('concurrency', {})['throttled_calls'] = runtime.throttles
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.time(),
+        'config': vars(args),
+        'results': results,
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + '\n')
+    else:
+        print(payload)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+""" Local stand-in for the bedrock-runtime client, for offline benchmarks.
+
+StubBedrockRuntime answers invoke_model and invoke_model_with_response_stream
+with canned completions after a configurable delay, streams chunks at a fixed
+cadence and raises ThrottlingException at a configurable rate.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bedrock_wrapper
+import model_router
+import project_history
+import response_cache
+from bedrock_wrapper import AWS_REGION, BedrockWrapper, MODEL_ID
+from project_history import ProjectHistory
+from response_cache import ResponseCache
+
+
+class StubBedrockRuntime:
+    """ Fake bedrock-runtime client with tunable latency and throttling """
+
+    def __init__(self, latency=0.0, chunk_interval=0.0, chunks=20, chunk_text='lorem ipsum ',
+                 throttle_rate=0.0, seed=0, stop_reason='stop_sequence'):
+        """ latency is the time to first byte; chunk_interval the gap between stream chunks """
+        self.latency = latency
+        self.chunk_interval = chunk_interval
+        self.chunks = chunks
+        self.chunk_text = chunk_text
+        self.throttle_rate = throttle_rate
+        self.stop_reason = stop_reason
+        self.calls = 0
+        self.throttles = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def invoke_model(self, body, modelId, accept, contentType):
+        """ Returns the whole completion after latency plus the full stream time """
+        self._start(modelId)
+        time.sleep(self.chunk_interval * self.chunks)
+        completion = self.chunk_text * self.chunks
+        payload = json.dumps({'completion': completion, 'stop_reason': self.stop_reason}).encode('utf-8')
+        return {
+            'ResponseMetadata': self._metadata(body),
+            'body': _Body(payload),
+        }
+
+    def invoke_model_with_response_stream(self, body, modelId, accept, contentType):
+        """ Returns an event stream yielding one chunk every chunk_interval """
+        self._start(modelId)
+        return {
+            'ResponseMetadata': self._metadata(body),
+            'body': self._events(body),
+        }
+
+    def close(self):
+        pass
+
+    def _start(self, model_id):
+        """ Counts the call, throttles at throttle_rate and waits out the latency """
+        with self._lock:
+            self.calls += 1
+            throttled = self._random.random() < self.throttle_rate
+            self.throttles += throttled
+        if throttled:
+            raise ClientError(
+                {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}},
+                'InvokeModel'
+            )
+        time.sleep(self.latency)
+
+    def _metadata(self, body):
+        return {
+            'HTTPStatusCode': 200,
+            'RetryAttempts': 0,
+            'HTTPHeaders': {
+                'x-amzn-bedrock-input-token-count': str(len(body) // 4),
+                'x-amzn-bedrock-output-token-count': str(len(self.chunk_text) * self.chunks // 4),
+            },
+        }
+
+    def _events(self, body):
+        for i in range(self.chunks):
+            if i:
+                time.sleep(self.chunk_interval)
+            payload = {'completion': self.chunk_text, 'stop_reason': None}
+            if i == self.chunks - 1:
+                payload['stop_reason'] = self.stop_reason
+                payload['amazon-bedrock-invocationMetrics'] = {
+                    'inputTokenCount': len(body) // 4,
+                    'outputTokenCount': len(self.chunk_text) * self.chunks // 4,
+                }
+            yield {'chunk': {'bytes': json.dumps(payload).encode('utf-8')}}
+
+
+class _Body:
+    """ Minimal StreamingBody """
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def read(self):
+        return self._payload
+
+
+def install_stub(runtime):
+    """ Makes get_bedrock(), get_router(), get_response_cache() and get_project_history() return offline instances """
+    bedrock = BedrockWrapper("bedrock", AWS_REGION)
+    bedrock.bedrock_runtime = runtime
+    bedrock.set_model(MODEL_ID)
+    bedrock_wrapper._bedrock = bedrock
+    model_router._router = None
+    response_cache._response_cache = ResponseCache(':memory:')
+    project_history._project_history = ProjectHistory(':memory:')
+    return bedrock
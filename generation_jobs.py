@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Number of generations that may run against Bedrock at the same time
+GENERATION_WORKERS = int(os.environ.get('GENERATION_WORKERS', 8))
+
+class GenerationJob:
+    """ A summary being generated in the background.
+
+    Chunks are appended as the model streams them, so a page can show the
+    partial text while polling. Jobs are shared by every session that asked
+    for the same key.
+    """
+
+    def __init__(self, key):
+        """ Creates a pending job for key """
+        self.key = key
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.started_at = time.time()
+        self._done = threading.Event()
+
+    @classmethod
+    def finished(cls, key, text):
+        """ Creates an already completed job, e.g. for a cached summary """
+        job = cls(key)
+        job.chunks.append(text)
+        job.result = text
+        job._done.set()
+        return job
+
+    @property
+    def text(self):
+        """ The final result once available, otherwise the text generated so far """
+        if self.result is not None:
+            return self.result
+        return ''.join(self.chunks)
+
+    def done(self):
+        """ True once the job has finished or failed """
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """ Blocks until the job is done; returns False on timeout """
+        return self._done.wait(timeout)
+
+    def run(self, generate):
+        """ Consumes the chunk generator returned by generate(); its return value is the result """
+        try:
+            chunks = generate()
+            while True:
+                try:
+                    self.chunks.append(next(chunks))
+                except StopIteration as stop:
+                    self.result = stop.value
+                    break
+        except Exception as e:
+            logger.exception("Generation job %s failed", self.key)
+            self.error = e
+        finally:
+            self._done.set()
+
+
+class JobExecutor:
+    """ Runs generation jobs on a thread pool, coalescing identical requests """
+
+    def __init__(self, max_workers=GENERATION_WORKERS):
+        """ Starts the worker pool """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='generation')
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, generate):
+        """ Returns the in-flight job for key, or starts generate() in a new one """
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None:
+                return job
+            job = GenerationJob(key)
+            self._inflight[key] = job
+        self._executor.submit(self._run, job, generate)
+        return job
+
+    def inflight(self):
+        """ Number of jobs currently running or queued """
+        return len(self._inflight)
+
+    def shutdown(self, wait=True):
+        """ Stops accepting jobs and optionally waits for running ones """
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job, generate):
+        """ Runs a job, then releases its key for new submissions """
+        try:
+            job.run(generate)
+        finally:
+            with self._lock:
+                self._inflight.pop(job.key, None)
+
+
+# Process-wide executor, shared by every Streamlit session
+_job_executor = None
+_job_executor_lock = threading.Lock()
+
+def get_job_executor():
+    """ Returns the shared JobExecutor, starting it on first use """
+    global _job_executor
+    if _job_executor is None:
+        with _job_executor_lock:
+            if _job_executor is None:
+                _job_executor = JobExecutor()
+    return _job_executor
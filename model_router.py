@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from bedrock_wrapper import MODEL_ID, get_bedrock
+from prompts import PROMPT_TOKEN_BUDGET, estimate_tokens
+from telemetry import Histogram, get_telemetry
+
+logger = logging.getLogger(__name__)
+
+# Models to try for each status colour, in order. Prompts over
+# LARGE_PROMPT_TOKENS use the 'large' route whatever their colour.
+# Routes in a MODEL_ROUTES JSON object override these one by one.
+DEFAULT_MODEL_ROUTES = {
+    'green': ['anthropic.claude-instant-v1', MODEL_ID],
+    'yellow': [MODEL_ID, 'anthropic.claude-instant-v1'],
+    'red': [MODEL_ID, 'anthropic.claude-instant-v1'],
+    'large': [MODEL_ID, 'anthropic.claude-instant-v1'],
+}
+MODEL_ROUTES = json.loads(os.environ.get('MODEL_ROUTES', 'null')) or {}
+# Must stay below PROMPT_TOKEN_BUDGET, or compaction keeps prompts from ever
+# reaching the large route; compact Yellow/Red prompts start at about 635 tokens
+LARGE_PROMPT_TOKENS = int(os.environ.get('LARGE_PROMPT_TOKENS', 1000))
+
+# Hedge to the next model once the primary is slower than its p95; until a
+# model has HEDGE_MIN_SAMPLES calls, wait the default delay instead
+HEDGING = os.environ.get('HEDGING', '1') == '1'
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = {
+    'stream': float(os.environ.get('HEDGE_DELAY_STREAM', 3.0)),
+    'blocking': float(os.environ.get('HEDGE_DELAY_BLOCKING', 30.0)),
+}
+
+
+class _Attempt:
+    """ One call to one model, run in its own thread """
+
+    def __init__(self, router, model_id, mode, call, results):
+        """ Starts calling model_id; events go to the results queue """
+        self.router = router
+        self.model_id = model_id
+        self.mode = mode
+        self.cancelled = threading.Event()
+        self._call = call
+        self._results = results
+        threading.Thread(target=self._run, name=f'bedrock-{model_id}', daemon=True).start()
+
+    def _run(self):
+        if self.router.limiter is not None:
+            self.router.limiter.acquire()
+        start = time.perf_counter()
+        chunks = None
+        observed = False
+        try:
+            chunks = self._call(self.model_id)
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration as stop:
+                    self._results.put((self, 'done', stop.value))
+                    break
+                if not observed:
+                    # Observe before honouring cancellation, so a primary that lost
+                    # a hedge still feeds its slow time into the rolling p95
+                    self.router.observe_latency(self.model_id, self.mode, time.perf_counter() - start)
+                    observed = True
+                if self.cancelled.is_set():
+                    break
+                self._results.put((self, 'chunk', chunk))
+        except Exception as e:
+            if self.cancelled.is_set() and not observed:
+                # A cancelled call that never answered took at least this long
+                self.router.observe_latency(self.model_id, self.mode, time.perf_counter() - start)
+            self._results.put((self, 'error', e))
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+
+
+class ModelRouter:
+    """ Routes calls to a model per status colour and prompt size.
+
+    Has the same calling interface as BedrockWrapper. A call that is slower
+    than the primary model's rolling p95 is hedged to the next model on the
+    route, and a throttled or failed call falls back to it; whichever model
+    answers first is used and recorded. A limiter, such as the batch script's
+    TokenBucket, is acquired before every model call, hedges and fallbacks
+    included.
+    """
+
+    def __init__(self, routes=MODEL_ROUTES, large_prompt_tokens=LARGE_PROMPT_TOKENS, hedging=HEDGING, limiter=None):
+        """ Creates a router with empty latency history; routes override the defaults """
+        self.routes = {**DEFAULT_MODEL_ROUTES, **routes}
+        for name, models in self.routes.items():
+            if not isinstance(models, list) or not models or not all(isinstance(model, str) for model in models):
+                raise ValueError(f"Route {name!r} must be a non-empty list of model ids")
+        if PROMPT_TOKEN_BUDGET and large_prompt_tokens >= PROMPT_TOKEN_BUDGET:
+            logger.warning("LARGE_PROMPT_TOKENS (%d) is not below PROMPT_TOKEN_BUDGET (%d); "
+                           "the large route will never be used", large_prompt_tokens, PROMPT_TOKEN_BUDGET)
+        self.large_prompt_tokens = large_prompt_tokens
+        self.hedging = hedging
+        self.limiter = limiter
+        self.latencies = {}
+        self.answers = {}
+        self._lock = threading.Lock()
+
+    def generate_body(self, prompt, params):
+        """ Sets model parameters and prompt """
+        return get_bedrock().generate_body(prompt, params)
+
+    def route(self, body, status=None):
+        """ Returns the models to try for a request, in order """
+        color = status.split()[0].lower() if status else None
+        prompt = json.loads(body).get('prompt', '')
+        if estimate_tokens(prompt) > self.large_prompt_tokens or color not in self.routes:
+            return self.routes['large']
+        return self.routes[color]
+
+    def cache_model_id(self, body, status=None):
+        """ Returns the model id for cache keys: the request's route, so changing MODEL_ROUTES invalidates it """
+        return ','.join(self.route(body, status))
+
+    def observe_latency(self, model_id, mode, seconds):
+        """ Records the time to first token (stream) or response (blocking) of a model """
+        with self._lock:
+            histogram = self.latencies.get((model_id, mode))
+            if histogram is None:
+                histogram = self.latencies[(model_id, mode)] = Histogram(max_samples=500)
+            histogram.observe(seconds)
+
+    def hedge_delay(self, model_id, mode):
+        """ Returns how long to wait for model_id before hedging """
+        with self._lock:
+            histogram = self.latencies.get((model_id, mode))
+            if histogram is None or len(histogram.samples) < HEDGE_MIN_SAMPLES:
+                return HEDGE_DEFAULT_DELAY[mode]
+            return histogram.quantile(0.95)
+
+    def invoke_model(self, body, status=None):
+        """ Calls the routed models and gets response string """
+        bedrock = get_bedrock()
+        chunks = self._race(body, status, 'blocking',
+                            lambda model_id: iter([bedrock.invoke_model(body, status, model_id)]))
+        return ''.join(chunks)
+
+    def invoke_model_stream(self, body, status=None):
+        """ Calls the routed models and yields the response string chunk by chunk; returns the stop reason """
+        bedrock = get_bedrock()
+        return (yield from self._race(body, status, 'stream',
+                                      lambda model_id: bedrock.invoke_model_stream(body, status, model_id)))
+
+    def _race(self, body, status, mode, call):
+        """ Yields the chunks of the first model to answer, hedging and falling back down the route.
+
+        Returns the winning call's return value.
+        """
+        models = list(self.route(body, status))
+        results = queue.Queue()
+        attempts = [_Attempt(self, models[0], mode, call, results)]
+        failed = 0
+        winner = None
+        deadline = time.monotonic() + self.hedge_delay(models[0], mode)
+        try:
+            while True:
+                can_hedge = winner is None and self.hedging and len(attempts) < len(models)
+                timeout = max(0.0, deadline - time.monotonic()) if can_hedge and len(attempts) == 1 else None
+                try:
+                    attempt, kind, payload = results.get(timeout=timeout)
+                except queue.Empty:
+                    logger.info("Hedging %s after %.2fs with %s", models[0], self.hedge_delay(models[0], mode), models[1])
+                    attempts.append(_Attempt(self, models[1], mode, call, results))
+                    continue
+                if winner is None:
+                    if kind == 'error':
+                        failed += 1
+                        logger.warning("Model %s failed: %s", attempt.model_id, payload)
+                        if len(attempts) < len(models):
+                            attempts.append(_Attempt(self, models[len(attempts)], mode, call, results))
+                        elif failed == len(attempts):
+                            raise payload
+                        continue
+                    winner = attempt
+                    if attempt is attempts[0]:
+                        reason = 'primary'
+                    else:
+                        reason = 'hedge' if failed == 0 else 'fallback'
+                    self._answered(winner.model_id, status, reason)
+                    for other in attempts:
+                        if other is not winner:
+                            other.cancelled.set()
+                if attempt is not winner:
+                    continue
+                if kind == 'chunk':
+                    yield payload
+                elif kind == 'done':
+                    return payload
+                else:
+                    raise payload
+        finally:
+            for attempt in attempts:
+                attempt.cancelled.set()
+
+    def _answered(self, model_id, status, reason):
+        """ Records which model answered a request and why """
+        with self._lock:
+            self.answers[(model_id, reason)] = self.answers.get((model_id, reason), 0) + 1
+        status = status.split()[0].lower() if status else 'unknown'
+        get_telemetry().count('router_answers_total', model=model_id, status=status, reason=reason)
+        logger.info("%s request answered by %s (%s)", status, model_id, reason)
+
+
+# Process-wide router, shared by every Streamlit session
+_router = None
+_router_lock = threading.Lock()
+
+def get_router():
+    """ Returns the shared ModelRouter, creating it on first use """
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
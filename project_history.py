@@ -0,0 +1,128 @@
+import datetime
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from prompts import FIELD_LABELS
+
+logger = logging.getLogger(__name__)
+
+# History settings, overridable from the environment
+PROJECT_HISTORY_PATH = os.environ.get('PROJECT_HISTORY_PATH', os.path.join('.cache', 'history.sqlite3'))
+
+# Fields identifying a report rather than describing the project's week
+KEY_FIELDS = ('project_name', 'status')
+
+# Report headings look like "[EXECUTIVE SUMMARY]" or "SITUATION:", or are the
+# one-line form fields such as "Project Margin:" and "Open EHI Flags:"
+FIELD_HEADINGS = [re.escape(label) for label in FIELD_LABELS.values()] + ['Project Status', r'Primary \w+ Status Reason']
+HEADING = re.compile(
+    r"^\s*(?:\[([A-Z][A-Z0-9 &/'-]+)\]|([A-Z][A-Z0-9 &/'-]+):|((?i:%s)):)" % '|'.join(FIELD_HEADINGS)
+)
+
+def current_week(day=None):
+    """ Returns the ISO week of day (default today), e.g. '2023-W14' """
+    year, week, _ = (day or datetime.date.today()).isocalendar()
+    return f'{year}-W{week:02d}'
+
+def changed_fields(previous_inputs, inputs):
+    """ Returns the fields of inputs that differ from previous_inputs """
+    return {
+        name: value for name, value in inputs.items()
+        if name not in KEY_FIELDS and str(previous_inputs.get(name, '')).strip() != str(value).strip()
+    }
+
+def _sections(report):
+    """ Splits a report into [(heading or None, lines)] """
+    sections = [(None, [])]
+    for line in report.splitlines():
+        match = HEADING.match(line)
+        if match:
+            heading = next(group for group in match.groups() if group)
+            sections.append((heading.strip().upper(), [line]))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+def merge_report(previous, delta, complete=True):
+    """ Replaces the sections of previous that delta rewrites, appending new ones.
+
+    A delta that is not complete, i.e. was cut off at the token limit, ends
+    in a partial section; that section is dropped and keeps last week's text.
+    """
+    updates = [(heading, lines) for heading, lines in _sections(delta) if heading]
+    if not complete:
+        if updates:
+            logger.warning("Report update hit the token limit; keeping last week's %s section", updates[-1][0])
+            updates.pop()
+        if not updates:
+            return previous
+    if not updates:
+        return previous.rstrip() + '\n\n' + delta.strip()
+    merged = _sections(previous)
+    headings = [heading for heading, _ in merged]
+    for heading, lines in updates:
+        if heading in headings:
+            merged[headings.index(heading)] = (heading, lines)
+        else:
+            merged.append((heading, lines))
+            headings.append(heading)
+    return '\n'.join(line for _, lines in merged for line in lines).strip()
+
+
+class ProjectHistory:
+    """ Inputs and generated summaries of each project, one report per week """
+
+    def __init__(self, path=PROJECT_HISTORY_PATH):
+        """ Opens (or creates) the history store """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS reports ('
+            'project_name TEXT NOT NULL, week TEXT NOT NULL, status TEXT NOT NULL, '
+            'inputs TEXT NOT NULL, summary TEXT NOT NULL, created_at REAL NOT NULL, '
+            'PRIMARY KEY (project_name, week))'
+        )
+        self._db.commit()
+
+    def save(self, week, inputs, summary):
+        """ Stores the report of inputs['project_name'] for week, replacing any earlier one """
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)',
+                (inputs['project_name'], week, inputs['status'], json.dumps(inputs, default=str),
+                 summary, datetime.datetime.now().timestamp())
+            )
+            self._db.commit()
+
+    def latest(self, project_name, before_week=None):
+        """ Returns the most recent report of project_name, optionally before a week """
+        query = 'SELECT week, status, inputs, summary FROM reports WHERE project_name = ?'
+        args = [project_name]
+        if before_week:
+            query += ' AND week < ?'
+            args.append(before_week)
+        with self._lock:
+            row = self._db.execute(query + ' ORDER BY week DESC LIMIT 1', args).fetchone()
+        if row is None:
+            return None
+        return {'week': row[0], 'status': row[1], 'inputs': json.loads(row[2]), 'summary': row[3]}
+
+
+# Process-wide history, shared by every Streamlit session
+_project_history = None
+_project_history_lock = threading.Lock()
+
+def get_project_history():
+    """ Returns the shared ProjectHistory, opening it on first use """
+    global _project_history
+    if _project_history is None:
+        with _project_history_lock:
+            if _project_history is None:
+                _project_history = ProjectHistory()
+    return _project_history
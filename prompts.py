@@ -0,0 +1,319 @@
+import math
+import os
+import threading
+from string import Formatter
+
+from telemetry import get_telemetry
+
+# Status report prompts for each project colour, shared by the Streamlit page
+# and the batch entry point. Templates are compiled once at import; rendering
+# only joins the static segments with the user's fields.
+
+STATUS_LABELS = {
+    'green': "Green 🟢",
+    'yellow': "Yellow 🟡",
+    'red': "Red 🔴",
+}
+
+# Rough characters per token for Claude models, used to estimate prompt size
+CHARS_PER_TOKEN = 3.5
+# Largest prompt, in estimated tokens, sent before compacting the prompt. The
+# full Yellow/Red prompt is about 1325 tokens before the user's fields, so the
+# default always sends the compact example (about 635 tokens, every section
+# kept) and leaves roughly 660 tokens for the fields before truncating them.
+# Green prompts have no compact example and are only truncated. Set 0 to
+# always send the full example and never truncate
+PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', 1300))
+# User fields are never truncated below this many characters
+MIN_FIELD_CHARS = 200
+TRUNCATION_MARKER = ' […]'
+
+GREEN_EXAMPLE = """Green Status Example
+Project Status: Green
+Project Status Notes:
+EXECUTIVE SUMMARY: The project is on track with no major risks or issues identified.
+WEEKLY UPDATE: Mobilize project is on schedule to migrate X apps by {date}; five of the eight work streams are active. No major risks identified. Budget and timing are on track."""
+
+# Few-shot example shared by the Yellow and Red prompts
+STATUS_EXAMPLE = """{Color} Status Example
+
+Project Status: {Color}
+
+Primary {Color} Status Reason: Scope - Change Request/Creep/Undefined
+
+Project Status Notes:
+
+[EXECUTIVE SUMMARY]
+Customer ABC is migrating its cashless payment and processing platform from Oracle (OCI) to AWS. The platform comprises 100 applications, 500 servers, and 700TB of PostgreSQL databases. This migration allows ABC to meet its business target of closing 2 data centers by December 15, 2023. The data center exit will reduce ABC’s data center expenses by $2M annually. This 16-week Mobilize engagement spans 6 work streams. They are: Landing Zone/Control Tower, Operations, Security, People & Change, Portfolio, and Migration.
+
+Open EHI Flags: DSR - review with engagement security slated for April 3, 2023. DSR close out date is April 7, 2023.
+
+Project Margin: ABC has a Project Margin variance of -5 percentage points (50% as sold vs. 45% as delivered). This variance is driven by two roles sold as L5 roles but staffed with L6 consultants. L6 consultants were needed to deliver the customer business outcome.
+
+SITUATION: ABC is {color} trending yellow. Schedule is at risk due to ABC experiencing attrition in key roles such as PostgreSQL developers, and database administrators. Continued attrition can impact PostgreSQL code conversion work supporting Oracle Exadata to PostgreSQL modernization and overall migration. Status across the 6 work streams is as follows:
+
+Landing Zone/Control Tower: The sprint goal is to deploy DNS in the Dev environment and the key deliverable this sprint is the completed deployment of DNS in Dev by April 4, 2023. The goal next sprint is to complete the DNS documentation in Confluence.
+Operations: The sprint goal is to define the disaster recovery strategy for ABC. The key deliverable is the documentation of the DR strategy in Confluence by April 4, 2023. The focus for next sprint is the implementation of the DR strategy
+Security: The sprint goal is to create a Runbook for Break Glass and the deliverable is a completed Runbook on confluence by April 4, 2023. The focus for next sprint is to complete the design for incident response.
+People & Change: The sprint goal is to draft the Cloud Center of Excellence (CCOE) charter. The key deliverable is the first draft of the CCOE charter by April 4, 2023. Next sprint’s goal is to complete the CCOE charter and present for ABC sign off.
+Portfolio: The goal this sprint is to validate migration list dependencies. The key deliverable is the updated migration plan with dependencies and owners identified by April 4, 2023. Next sprint will focus on finalizing the overall migration plan.
+Migration: The sprint goal is to resolve errors reported in PostgreSQL import scripts by April 4, 2023. The goal next sprint is to kick off data migration for the Dev environment.
+IMPACT: If ABC loses one more developer or database administrator, the code conversion work with fall behind by 2 weeks translating to an overall migration schedule delay of 1 month. This will jeopardize ABC’s data center exit timeline.
+
+GET-TO-GREEN PLAN:
+Monitor ABC staff attrition trends and discuss how ProServe/partner can assist with staffing needs for ABC
+
+Owner: EM
+Status: In progress
+Target completion date: 06-04-2023
+DSR Completion
+Owner: EM
+Status: In progress
+Target Completion Date: 07-04-2023
+Key Risks/Issues:
+
+Risk (R-001 - open]: Tight migration timeline with little slack in the schedule for delays
+Mitigation: Continue to inspect sprints across migration program and remediate risks/issues that impact schedule.
+Owner: IJK (EM)
+Target Close Date: 15-03-2024
+Issue (I-002 - open): ABC Staff Attrition
+Mitigation: Work with ABC to monitor attrition trends. Status for immediate attention. Recommend options for ProServe to help mitigate issues by providing staff to support.
+Owner: IJK (EM)
+Target Close Date:15-09-2023
+[OWNERS]: EFG (EM)
+[TARGET RESOLUTION DATE]: 07-04-2023
+TARGET PROJECT COMPLETION DATE: 15-12-2023
+
+CUSTOMER TEMPERATURE: yellow - the customer is concerned about attrition and unplanned schedule delays. The customer returned a CFF rating of “very satisfied” on March 1, 2023.
+
+Here are links to the Risk Log and Issue Log"""
+
+# Shorter version of STATUS_EXAMPLE, keeping every section, used over budget
+COMPACT_STATUS_EXAMPLE = """{Color} Status Example
+Project Status: {Color}
+Primary {Color} Status Reason: Scope - Change Request/Creep/Undefined
+Project Status Notes:
+[EXECUTIVE SUMMARY]
+Customer ABC is migrating its payment platform (100 applications, 500 servers, 700TB of PostgreSQL) from Oracle (OCI) to AWS to close 2 data centers by December 15, 2023. This 16-week Mobilize engagement spans 6 work streams.
+Open EHI Flags: DSR review slated for April 3, 2023; close out April 7, 2023.
+Project Margin: -5 percentage points (50% as sold vs. 45% as delivered), driven by two L5 roles staffed with L6 consultants.
+SITUATION: ABC is {color} trending yellow. Schedule is at risk due to attrition of PostgreSQL developers and DBAs. Status per work stream:
+Security: The sprint goal is a Break Glass Runbook on Confluence by April 4, 2023. Next sprint: incident response design.
+Migration: The sprint goal is to resolve PostgreSQL import script errors by April 4, 2023. Next sprint: Dev data migration kick off.
+IMPACT: Losing one more developer or DBA delays code conversion by 2 weeks and the migration by 1 month, jeopardizing the data center exit.
+GET-TO-GREEN PLAN:
+Monitor ABC staff attrition and discuss how ProServe/partner can assist with staffing
+Owner: EM
+Status: In progress
+Target completion date: 06-04-2023
+Key Risks/Issues:
+Issue (I-002 - open): ABC Staff Attrition
+Mitigation: Monitor attrition trends with ABC and offer ProServe staff to support.
+Owner: IJK (EM)
+Target Close Date: 15-09-2023
+[OWNERS]: EFG (EM)
+[TARGET RESOLUTION DATE]: 07-04-2023
+TARGET PROJECT COMPLETION DATE: 15-12-2023
+CUSTOMER TEMPERATURE: yellow - the customer is concerned about attrition and schedule delays. CFF rating of “very satisfied” on March 1, 2023.
+Here are links to the Risk Log and Issue Log"""
+
+GREEN_TEMPLATE = """Human: You are an Engagement manager expert and you have to generate a project status each week based on the project colour.
+If the project status from {project_status} is green you have to generate the summary of the project using this example:
+{example}
+Here are the information collected <transcript>{project_name}, {executive_summary}, {project_activities_this_week}, {project_activities_next_week}, {project_target_date} </transcript> let's go
+Assistant:"""
+
+STATUS_TEMPLATE = """Human: You are an Engagement manager expert and you have to generate a project status each week based on the project colour. You will use the human input and the expert project management practices to elaborate a get to green path based on the {project_risk} stated
+
+If the project status from {project_status} is {color}, you have to generate the summary of the project using this example:
+{example}
+Here are the information collected <transcript>{project_name}, {executive_summary}, {project_primary_reason}, {project_target_date}, {project_status_this_week}, {project_activities_this_week}, {project_activities_next_week}, {project_risk}, {project_open_ehi_flags}, {project_margin}  </transcript> let's go
+Assistant:"""
+
+UPDATE_TEMPLATE = """Human: You are an Engagement manager expert and you have to update last week's project status report for {project_name}. The project status is {project_status}.
+Here is last week's report <previous_report>{previous_summary}</previous_report>
+Here are the only fields that changed since last week <changes>{changes}</changes>
+Rewrite only the sections of the report affected by these changes. Start each rewritten section with its heading exactly as it appears in last week's report and do not repeat unchanged sections.
+Assistant:"""
+
+# Labels of the form fields, used to describe week-over-week changes
+FIELD_LABELS = {
+    'executive_summary': 'Executive Summary',
+    'project_target_date': 'Target Project Completion Date',
+    'project_status_this_week': 'Status this week',
+    'project_activities_this_week': 'Project Activities this week',
+    'project_activities_next_week': 'Project Activities for next week',
+    'reason': 'Primary status reason',
+    'project_open_ehi_flags': 'Open EHI Flags',
+    'project_margin': 'Project Margin',
+    'project_risk': 'Project Risk',
+}
+
+
+def estimate_tokens(text):
+    """ Estimates the number of tokens in text """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate(text, length):
+    """ Shortens text to at most length characters, marking the cut """
+    if len(text) <= length:
+        return text
+    return text[:max(0, length - len(TRUNCATION_MARKER))].rstrip() + TRUNCATION_MARKER
+
+
+class PromptTemplate:
+    """ A prompt compiled once into static segments and field placeholders.
+
+    render() fills in the fields and keeps the prompt within a token budget,
+    first by switching to the compact few-shot example, then by truncating
+    the longest user fields.
+    """
+
+    def __init__(self, color, template, example, compact_example):
+        """ Compiles the full and compact variants of template """
+        self.color = color
+        self.full = self._compile(template, example)
+        self.compact = self._compile(template, compact_example)
+        self.has_compact = len(compact_example) < len(example)
+        self.fields = [name for _, name in self.full if name is not None]
+
+    def _compile(self, template, example):
+        """ Returns [(literal, field name or None), ...] with example inlined """
+        template = template.replace('{example}', example.replace('{', '{{').replace('}', '}}'))
+        template = template.replace('{color}', self.color)
+        segments = []
+        for literal, name, _, _ in Formatter().parse(template):
+            segments.append((literal, None))
+            if name is not None:
+                segments.append(('', name))
+        return segments
+
+    @staticmethod
+    def _join(segments, fields):
+        return ''.join(fields[name] if name is not None else text for text, name in segments)
+
+    def render(self, fields, budget=PROMPT_TOKEN_BUDGET, protected=()):
+        """ Returns (prompt, stats) for fields, compacted to fit budget tokens.
+
+        Fields named in protected are never truncated.
+        """
+        fields = {name: str(fields[name]) for name in self.fields}
+        truncatable = [name for name in fields if name not in protected]
+        segments = self.full
+        prompt = self._join(segments, fields)
+        stats = {'compacted': False, 'truncated': []}
+        if budget and self.has_compact and estimate_tokens(prompt) > budget:
+            stats['compacted'] = True
+            segments = self.compact
+            prompt = self._join(segments, fields)
+        while budget and truncatable and estimate_tokens(prompt) > budget:
+            name = max(truncatable, key=lambda n: len(fields[n]))
+            overflow = math.ceil((estimate_tokens(prompt) - budget) * CHARS_PER_TOKEN)
+            length = max(MIN_FIELD_CHARS, len(fields[name]) - overflow)
+            if length >= len(fields[name]):
+                break
+            fields[name] = truncate(fields[name], length)
+            if name not in stats['truncated']:
+                stats['truncated'].append(name)
+            prompt = self._join(segments, fields)
+        stats['tokens'] = estimate_tokens(prompt)
+        return prompt, stats
+
+
+class PromptRegistry:
+    """ The compiled templates, with prompt size stats for each status colour """
+
+    def __init__(self):
+        """ Compiles every template """
+        self.templates = {
+            'green': PromptTemplate('green', GREEN_TEMPLATE, GREEN_EXAMPLE, GREEN_EXAMPLE),
+            'yellow': PromptTemplate('yellow', STATUS_TEMPLATE,
+                                     STATUS_EXAMPLE.format(Color='Yellow', color='yellow'),
+                                     COMPACT_STATUS_EXAMPLE.format(Color='Yellow', color='yellow')),
+            'red': PromptTemplate('red', STATUS_TEMPLATE,
+                                  STATUS_EXAMPLE.format(Color='Red', color='red'),
+                                  COMPACT_STATUS_EXAMPLE.format(Color='Red', color='red')),
+            'update': PromptTemplate('update', UPDATE_TEMPLATE, '', ''),
+        }
+        self.stats = {color: {'prompts': 0, 'tokens': 0, 'compacted': 0, 'truncated': 0} for color in STATUS_LABELS}
+        self._lock = threading.Lock()
+
+    def render(self, name, fields, budget=PROMPT_TOKEN_BUDGET, protected=()):
+        """ Renders the prompt of template name and records its size """
+        prompt, stats = self.templates[name].render(fields, budget, protected)
+        if name in self.stats:
+            with self._lock:
+                totals = self.stats[name]
+                totals['prompts'] += 1
+                totals['tokens'] += stats['tokens']
+                totals['compacted'] += stats['compacted']
+                totals['truncated'] += bool(stats['truncated'])
+        telemetry = get_telemetry()
+        telemetry.observe('prompt_estimated_tokens', stats['tokens'], template=name)
+        if stats['compacted']:
+            telemetry.count('prompt_compacted_total', template=name)
+        if stats['truncated']:
+            telemetry.count('prompt_truncated_total', template=name)
+        return prompt
+
+
+TEMPLATES = PromptRegistry()
+
+
+def green_prompt(**fields):
+    """ Builds the prompt for a Green status summary """
+    return TEMPLATES.render('green', fields)
+
+def yellow_prompt(project_primary_yellow_reason, **fields):
+    """ Builds the prompt for a Yellow status summary with a get-to-green path """
+    return TEMPLATES.render('yellow', dict(fields, project_primary_reason=project_primary_yellow_reason))
+
+def red_prompt(project_primary_red_reason, **fields):
+    """ Builds the prompt for a Red status summary with a get-to-green plan """
+    return TEMPLATES.render('red', dict(fields, project_primary_reason=project_primary_red_reason))
+
+def update_prompt(project_status, project_name, previous_summary, changes):
+    """ Builds the prompt updating last week's report with only the changed fields.
+
+    Last week's report is never truncated and does not count toward the
+    budget: the model has to see every section it may rewrite, so only the
+    changed fields give way.
+    """
+    changes = '\n'.join(f'{FIELD_LABELS.get(name, name)}: {value}' for name, value in changes.items())
+    return TEMPLATES.render('update', dict(
+        project_status=project_status,
+        project_name=project_name,
+        previous_summary=previous_summary,
+        changes=changes,
+    ), budget=PROMPT_TOKEN_BUDGET and PROMPT_TOKEN_BUDGET + estimate_tokens(previous_summary),
+        protected=('previous_summary',))
+
+def build_prompt(record):
+    """ Builds the prompt for a project record dict.
+
+    The record holds the same fields as the Streamlit form; 'status' is the
+    colour (green, yellow or red) and 'reason' the primary Yellow/Red reason.
+    """
+    color = record['status'].split()[0].lower()
+    if color not in STATUS_LABELS:
+        raise ValueError(f"Unknown project status: {record['status']}")
+    fields = dict(
+        project_status=STATUS_LABELS[color],
+        project_name=record['project_name'],
+        executive_summary=record['executive_summary'],
+        project_target_date=record.get('project_target_date', ''),
+        project_status_this_week=record.get('project_status_this_week', 'On Track'),
+        project_activities_this_week=record['project_activities_this_week'],
+        project_activities_next_week=record['project_activities_next_week'],
+    )
+    if color == 'green':
+        return green_prompt(**fields)
+    fields.update(
+        project_open_ehi_flags=record.get('project_open_ehi_flags', ''),
+        project_margin=record.get('project_margin', ''),
+        project_risk=record.get('project_risk', ''),
+    )
+    if color == 'yellow':
+        return yellow_prompt(project_primary_yellow_reason=record.get('reason', ''), **fields)
+    return red_prompt(project_primary_red_reason=record.get('reason', ''), **fields)
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Cache settings, overridable from the environment
+RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH', os.path.join('.cache', 'responses.sqlite3'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 7 * 24 * 3600))
+RESPONSE_CACHE_MAX_ROWS = int(os.environ.get('RESPONSE_CACHE_MAX_ROWS', 10000))
+
+class ResponseCache:
+    """ Content-addressed cache of model completions.
+
+    Entries live in an in-process LRU and in a SQLite file, so hits survive
+    restarts. Both tiers expire entries older than ttl seconds; the file keeps
+    at most max_rows entries, dropping the oldest first.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL,
+                 max_rows=RESPONSE_CACHE_MAX_ROWS):
+        """ Opens (or creates) the on-disk store """
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)')
+        self._db.commit()
+
+    @staticmethod
+    def make_key(model_id, body, params):
+        """ Hashes everything that determines the completion """
+        payload = json.dumps([model_id, body, params], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """ Returns the cached completion for key, or None """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._memory.pop(key, None)
+            row = self._db.execute(
+                'SELECT value, created_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None and now - row[1] < self.ttl:
+                self._remember(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+            if row is not None:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._db.commit()
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """ Stores a completion in both tiers, pruning expired and excess rows from the file """
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)',
+                (key, value, now)
+            )
+            self._db.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_rows,)
+            )
+            self._db.commit()
+
+    def clear(self):
+        """ Drops every entry and resets the counters """
+        with self._lock:
+            self._memory.clear()
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        """ Returns the hit/miss counters """
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'entries': len(self._memory),
+        }
+
+    def _remember(self, key, value, created_at):
+        """ Inserts into the LRU, evicting the least recently used entries """
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# Process-wide cache, shared by every Streamlit session
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """ Returns the shared ResponseCache, opening it on first use """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
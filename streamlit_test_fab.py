@@ -1,69 +1,136 @@
-import streamlit as st
-import logging
-import boto3
-from botocore.exceptions import ClientError
-import json
-import os
-
-#BEDROCK PART
-# Fetch AWS credentials from environment variables
-AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
-AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
-AWS_REGION = os.environ.get('AWS_REGION', 'us-west-2')
-
-class BedrockWrapper:
-  
-    def __init__(self, service, region):
-        """ Initiates the bedrock client and runtime """
-        self.bedrock_client = boto3.client(service_name=service, region_name=region)
-        self.bedrock_runtime = boto3.client('bedrock-runtime', region_name=region)
-
-    def list_foundation_models(self):
-        """ List the foundational models available """
-        response = self.bedrock_client.list_foundation_models()
-        models = response["modelSummaries"]
-        print(f"Got {len(models)} foundation models.", models)
-
-    def set_model(self, model_id):
-        """ Sets the generative AI model ID to be used """
-        self.model_id = model_id
+import datetime
 
-    def generate_body(self, prompt, params):
-        """ Sets model parameters and prompt """
-        body = json.dumps({
-            'prompt': prompt,
-            **params
-        })
-        return body
-
-    def invoke_model(self, body):
-        """ Calls the model and gets response string """
-        accept = 'application/json'
-        contentType = 'application/json'
-        response = self.bedrock_runtime.invoke_model(
-            body=body, modelId=self.model_id, 
-            accept=accept, contentType=contentType
-        )
-        response_body = json.loads(response['body'].read())
-        result = response_body.get('completion')
-        return result
-
-# Initialize Bedrock
-bedrock = BedrockWrapper("bedrock", AWS_REGION)
-model_id = 'anthropic.claude-v2'
-bedrock.set_model(model_id)
+import streamlit as st
 
-params = {
-    "max_tokens_to_sample": 1000,
-    "temperature": 0.1,
-    "top_p": 0.1,
-}
+from bedrock_wrapper import DELTA_PARAMS, PARAMS, prewarm_bedrock
+from generation_jobs import GenerationJob, get_job_executor
+from model_router import get_router
+from project_history import changed_fields, current_week, get_project_history, merge_report
+from prompts import TEMPLATES, build_prompt, update_prompt
+from response_cache import get_response_cache
+from telemetry import get_telemetry
+
+params = PARAMS
+
+# Initialize the response cache
+cache = get_response_cache()
+
+# Initialize the background generation jobs
+jobs = get_job_executor()
+
+# Initialize the per-project report history
+history = get_project_history()
+
+def generate_summary(bedrock, body, key, record, finalize=None):
+    """ Streams the model output, then caches and stores the finished report """
+    chunks = []
+    stream = bedrock.invoke_model_stream(body, record['status'])
+    while True:
+        try:
+            chunk = next(stream)
+        except StopIteration as stop:
+            stop_reason = stop.value
+            break
+        chunks.append(chunk)
+        yield chunk
+    output = ''.join(chunks)
+    if not output:
+        return output
+    summary = finalize(output, stop_reason) if finalize else output
+    cache.set(key, summary)
+    history.save(current_week(), record, summary)
+    return summary
+
+def submit_prompt(prompt, record, params, force_regenerate=False, finalize=None):
+    """ Returns a job for the report of prompt, served from the cache when possible.
+
+    finalize(output, stop_reason) turns the model output into the report.
+    """
+    bedrock = get_router()
+    body = bedrock.generate_body(prompt, params)
+    key = cache.make_key(bedrock.cache_model_id(body, record['status']), body, params)
+    summary = None if force_regenerate else cache.get(key)
+    if summary is not None:
+        history.save(current_week(), record, summary)
+        return GenerationJob.finished(key, summary)
+    return jobs.submit(key, lambda: generate_summary(bedrock, body, key, record, finalize))
+
+def submit_summary(record, force_regenerate=False):
+    """ Returns a job for the report of record, updating last week's report when possible """
+    previous = history.latest(record['project_name'], before_week=current_week())
+    if force_regenerate or previous is None or previous['status'] != record['status']:
+        return submit_prompt(build_prompt(record), record, params, force_regenerate)
+    changes = changed_fields(previous['inputs'], record)
+    if not changes:
+        history.save(current_week(), record, previous['summary'])
+        return GenerationJob.finished(None, previous['summary'])
+    prompt = update_prompt(record['status'], record['project_name'], previous['summary'], changes)
+    # An update cut off at the token limit drops its partial last section
+    return submit_prompt(prompt, record, DELTA_PARAMS, finalize=lambda output, stop_reason: merge_report(
+        previous['summary'], output, complete=stop_reason != 'max_tokens'))
+
+def last_inputs(project_name):
+    """ Returns the inputs of the project's latest report, to prefill the form """
+    previous = history.latest(project_name) if project_name else None
+    return previous['inputs'] if previous else {}
+
+def prefill_form(project_name):
+    """ Seeds the form widgets from the project's latest report when the project name changes.
+
+    Runs before the widgets are created and only once per name, so reports
+    saved later, by this session or another, never overwrite the user's edits.
+    """
+    if st.session_state.get("prefilled_project") == project_name:
+        return
+    st.session_state.prefilled_project = project_name
+    options = {'project_status_this_week': WEEKLY_STATUSES, 'reason': PRIMARY_REASONS}
+    for name, value in last_inputs(project_name).items():
+        if name not in FORM_FIELDS or (name in options and value not in options[name]):
+            continue
+        if name == 'project_target_date':
+            value = datetime.date.fromisoformat(value)
+        st.session_state[name] = value
+
+def show_summary(job):
+    """ Writes the summary generated so far """
+    st.write("Summary:")
+    if job.error is not None:
+        st.error(f"Summary generation failed: {job.error}")
+    else:
+        st.write(job.text)
+
+@st.fragment(run_every=0.5)
+def poll_summary(job):
+    """ Refreshes the partial summary until the job finishes """
+    show_summary(job)
+    if job.done():
+        st.rerun()
+    st.caption("Generating…")
+
+def render_summary(project_status):
+    """ Shows the summary job submitted for project_status, if any """
+    job = st.session_state.summary_jobs.get(project_status)
+    if job is None:
+        return
+    if job.done():
+        show_summary(job)
+    else:
+        poll_summary(job)
 
 # STREAMLIT
+WEEKLY_STATUSES = ("On Track", "At Risk", "Off Track")
+# Form fields prefilled from the project's latest report; also their widget keys
+FORM_FIELDS = ('executive_summary', 'project_target_date', 'project_status_this_week',
+               'project_activities_this_week', 'project_activities_next_week', 'reason',
+               'project_open_ehi_flags', 'project_margin', 'project_risk')
+PRIMARY_REASONS = ("Pre-SOW - Work at risk (WAR)","Scope - ProServe Initiated,Custom solution gap","Customer - Market/business factors","ProServe – Delivery delay","ProServe - Service/ Platform/ Product","ProServe – Budget","ProServe – Consultant Availability/Skill Gap","ProServe - Delivery Quality","ProServe - Work at Risk (WAR)","Customer - Budget Reduction","Customer – Delay/Hold","Customer – Alignment","Customer - Readiness","Customer – Resource Availability/Capacity/Skill Gap","Customer - Required Onboarding/Screening of ProServe Consultants","Customer - Sponsor","Partner – Delivery delay","Partner - Delivery Quality","Partner - Alignment","Partner – Resource Availability/Skill Gap","Contract","Scope - Customer","Security","Third party dependency (ISV, Vendor, SI, Regulator)")
+
 # Store the initial value of widgets in session state
 if "visibility" not in st.session_state:
     st.session_state.visibility = "visible"
     st.session_state.disabled = False
+if "summary_jobs" not in st.session_state:
+    st.session_state.summary_jobs = {}
 
 col1, col2 = st.columns(2)
 
@@ -83,206 +150,138 @@ with col2:
         disabled=st.session_state.disabled,
     )
 
+with st.sidebar:
+    force_regenerate = st.checkbox("Force regenerate", help="Ignore cached summaries and call the model again")
+    cache_stats = cache.stats()
+    st.caption(f"Summary cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    if st.query_params.get("debug"):
+        telemetry = get_telemetry()
+        with st.expander("Bedrock telemetry"):
+            st.write("Recent calls")
+            st.dataframe(list(telemetry.recent))
+            st.write("Latency and token histograms")
+            st.dataframe(telemetry.snapshot()['histograms'])
+            st.write("Prompt sizes per colour")
+            st.dataframe(TEMPLATES.stats)
+            st.download_button("Prometheus metrics", telemetry.render_prometheus(), "metrics.txt")
+
 #Green Status summary
 if project_status == "Green 🟢":
     st.write("This seems to be on the right track! Good job!")
-    project_name = st.text_input('Enter the project name:')
-    executive_summary = st.text_area('Executive Summary:')
-    project_target_date = st.date_input("Target Project Completion Date:")
+    project_name = st.text_input('Enter the project name:', key="project_name")
+    prefill_form(project_name)
+    executive_summary = st.text_area('Executive Summary:', key="executive_summary")
+    project_target_date = st.date_input("Target Project Completion Date:", key="project_target_date")
     project_status_this_week = st.selectbox(
         "What is the status of your project this week?",
-        ("On Track", "At Risk", "Off Track"),
+        WEEKLY_STATUSES,
+        key="project_status_this_week",
     )
-    project_activities_this_week = st.text_area('Project Activities this week:')
-    project_activities_next_week = st.text_area('Project Activities for next week:')
+    project_activities_this_week = st.text_area('Project Activities this week:', key="project_activities_this_week")
+    project_activities_next_week = st.text_area('Project Activities for next week:', key="project_activities_next_week")
     
     #Generate summary for Green Status
     if st.button('Generate Summary'):
         if project_name and executive_summary and project_activities_this_week and project_activities_next_week:
-            prompt = f"""Human: You are an Engagement manager expert and you have to generate a project status each week based on the project colour. 
-                If the project status from {project_status} is green you have to generate the summary of the project using this example: 
-                Green Status Example 
-                Project Status: Green 
-                Project Status Notes:
-                EXECUTIVE SUMMARY: The project is on track with no major risks or issues identified.
-                WEEKLY UPDATE: Mobilize project is on schedule to migrate X apps by {{date}}; five of the eight work streams are active. No major risks identified. Budget and timing are on track.
-        Here are the information collected <transcript>{project_name}, {executive_summary}, {project_activities_this_week}, {project_activities_next_week}, {project_target_date} </transcript> let's go
-        Assistant:"""
-
-            body = bedrock.generate_body(prompt, params)
-            summary = bedrock.invoke_model(body)
-            st.write("Summary:", summary)
+            record = dict(
+                status=project_status,
+                project_name=project_name,
+                executive_summary=executive_summary,
+                project_target_date=str(project_target_date),
+                project_status_this_week=project_status_this_week,
+                project_activities_this_week=project_activities_this_week,
+                project_activities_next_week=project_activities_next_week,
+            )
+
+            st.session_state.summary_jobs[project_status] = submit_summary(record, force_regenerate)
         else:
             st.error("Please fill in all the fields to generate the summary.")
+    render_summary(project_status)
 
 
 if project_status == "Yellow 🟡":
     st.write("Don't worry it will be fine")
-    project_name = st.text_input('Enter the project name:')
-    executive_summary = st.text_area('Executive Summary:')
-    project_target_date = st.date_input("Target Project Completion Date:")
+    project_name = st.text_input('Enter the project name:', key="project_name")
+    prefill_form(project_name)
+    executive_summary = st.text_area('Executive Summary:', key="executive_summary")
+    project_target_date = st.date_input("Target Project Completion Date:", key="project_target_date")
     project_status_this_week = st.selectbox(
         "What is the status of your project this week?",
-        ("On Track", "At Risk", "Off Track"),
+        WEEKLY_STATUSES,
+        key="project_status_this_week",
     )
-    project_activities_this_week = st.text_area('Project Activities this week:')
-    project_activities_next_week = st.text_area('Project Activities for next week:')
+    project_activities_this_week = st.text_area('Project Activities this week:', key="project_activities_this_week")
+    project_activities_next_week = st.text_area('Project Activities for next week:', key="project_activities_next_week")
     project_primary_yellow_reason = st.selectbox (
         "What is the primary reason for a Yellow status? : if any doubt please refer to the wiki page : https://w.amazon.com/bin/view/AWS/Teams/Proserve/Delivery/StatusReporting/ ",
-        ("Pre-SOW - Work at risk (WAR)","Scope - ProServe Initiated,Custom solution gap","Customer - Market/business factors","ProServe – Delivery delay","ProServe - Service/ Platform/ Product","ProServe – Budget","ProServe – Consultant Availability/Skill Gap","ProServe - Delivery Quality","ProServe - Work at Risk (WAR)","Customer - Budget Reduction","Customer – Delay/Hold","Customer – Alignment","Customer - Readiness","Customer – Resource Availability/Capacity/Skill Gap","Customer - Required Onboarding/Screening of ProServe Consultants","Customer - Sponsor","Partner – Delivery delay","Partner - Delivery Quality","Partner - Alignment","Partner – Resource Availability/Skill Gap","Contract","Scope - Customer","Security","Third party dependency (ISV, Vendor, SI, Regulator)"),
+        PRIMARY_REASONS,
+        key="reason",
     )
-    project_open_ehi_flags = st.text_area ('Open EHI Flags:')
-    project_margin = st.text_area ('Project Margin:')
-    project_risk = st.text_area ('Project Risk:')
+    project_open_ehi_flags = st.text_area ('Open EHI Flags:', key="project_open_ehi_flags")
+    project_margin = st.text_area ('Project Margin:', key="project_margin")
+    project_risk = st.text_area ('Project Risk:', key="project_risk")
     if st.button('Generate Summary'):
         if project_name and executive_summary and project_activities_this_week and project_activities_next_week:
-            prompt = f"""Human: You are an Engagement manager expert and you have to generate a project status each week based on the project colour. You will use the human input and the expert project management practices to elaborate a get to green path based on the {project_risk} stated
-                
-                
-                If the project status from {project_status} is yellow, you have to generate the summary of the project using this example: 
-                Yellow Status Example
-                
-                Project Status: Yellow
-                
-                Primary Yellow Status Reason: Scope - Change Request/Creep/Undefined
-                
-                Project Status Notes:
-
-                [EXECUTIVE SUMMARY]
-                Customer ABC is migrating its cashless payment and processing platform from Oracle (OCI) to AWS. The platform comprises 100 applications, 500 servers, and 700TB of PostgreSQL databases. This migration allows ABC to meet its business target of closing 2 data centers by December 15, 2023. The data center exit will reduce ABC’s data center expenses by $2M annually. This 16-week Mobilize engagement spans 6 work streams. They are: Landing Zone/Control Tower, Operations, Security, People & Change, Portfolio, and Migration.
-
-                Open EHI Flags: DSR - review with engagement security slated for April 3, 2023. DSR close out date is April 7, 2023.
-
-                Project Margin: ABC has a Project Margin variance of -5 percentage points (50% as sold vs. 45% as delivered). This variance is driven by two roles sold as L5 roles but staffed with L6 consultants. L6 consultants were needed to deliver the customer business outcome.
-
-                SITUATION: ABC is yellow trending yellow. Schedule is at risk due to ABC experiencing attrition in key roles such as PostgreSQL developers, and database administrators. Continued attrition can impact PostgreSQL code conversion work supporting Oracle Exadata to PostgreSQL modernization and overall migration. Status across the 6 work streams is as follows:
-
-                Landing Zone/Control Tower: The sprint goal is to deploy DNS in the Dev environment and the key deliverable this sprint is the completed deployment of DNS in Dev by April 4, 2023. The goal next sprint is to complete the DNS documentation in Confluence.
-                Operations: The sprint goal is to define the disaster recovery strategy for ABC. The key deliverable is the documentation of the DR strategy in Confluence by April 4, 2023. The focus for next sprint is the implementation of the DR strategy
-                Security: The sprint goal is to create a Runbook for Break Glass and the deliverable is a completed Runbook on confluence by April 4, 2023. The focus for next sprint is to complete the design for incident response.
-                People & Change: The sprint goal is to draft the Cloud Center of Excellence (CCOE) charter. The key deliverable is the first draft of the CCOE charter by April 4, 2023. Next sprint’s goal is to complete the CCOE charter and present for ABC sign off.
-                Portfolio: The goal this sprint is to validate migration list dependencies. The key deliverable is the updated migration plan with dependencies and owners identified by April 4, 2023. Next sprint will focus on finalizing the overall migration plan.
-                Migration: The sprint goal is to resolve errors reported in PostgreSQL import scripts by April 4, 2023. The goal next sprint is to kick off data migration for the Dev environment.
-                IMPACT: If ABC loses one more developer or database administrator, the code conversion work with fall behind by 2 weeks translating to an overall migration schedule delay of 1 month. This will jeopardize ABC’s data center exit timeline.
-
-                GET-TO-GREEN PLAN:
-                Monitor ABC staff attrition trends and discuss how ProServe/partner can assist with staffing needs for ABC
-
-                Owner: EM
-                Status: In progress
-                Target completion date: 06-04-2023
-                DSR Completion
-                Owner: EM
-                Status: In progress
-                Target Completion Date: 07-04-2023
-                Key Risks/Issues:
-
-                Risk (R-001 - open]: Tight migration timeline with little slack in the schedule for delays
-                Mitigation: Continue to inspect sprints across migration program and remediate risks/issues that impact schedule.
-                Owner: IJK (EM)
-                Target Close Date: 15-03-2024
-                Issue (I-002 - open): ABC Staff Attrition
-                Mitigation: Work with ABC to monitor attrition trends. Status for immediate attention. Recommend options for ProServe to help mitigate issues by providing staff to support.
-                Owner: IJK (EM)
-                Target Close Date:15-09-2023
-                [OWNERS]: EFG (EM)
-                [TARGET RESOLUTION DATE]: 07-04-2023
-                TARGET PROJECT COMPLETION DATE: 15-12-2023
-
-                CUSTOMER TEMPERATURE: yellow - the customer is concerned about attrition and unplanned schedule delays. The customer returned a CFF rating of “very satisfied” on March 1, 2023.
-
-                Here are links to the Risk Log and Issue Log
-        Here are the information collected <transcript>{project_name}, {executive_summary}, {project_primary_yellow_reason}, {project_target_date}, {project_status_this_week}, {project_activities_this_week}, {project_activities_next_week}, {project_risk}, {project_open_ehi_flags}, {project_margin}  </transcript> let's go
-        Assistant:"""
-
-            body = bedrock.generate_body(prompt, params)
-            summary = bedrock.invoke_model(body)
-            st.write("Summary:", summary)
+            record = dict(
+                status=project_status,
+                project_name=project_name,
+                executive_summary=executive_summary,
+                project_target_date=str(project_target_date),
+                project_status_this_week=project_status_this_week,
+                project_activities_this_week=project_activities_this_week,
+                project_activities_next_week=project_activities_next_week,
+                reason=project_primary_yellow_reason,
+                project_open_ehi_flags=project_open_ehi_flags,
+                project_margin=project_margin,
+                project_risk=project_risk,
+            )
+
+            st.session_state.summary_jobs[project_status] = submit_summary(record, force_regenerate)
         else:
             st.error("Please fill in all the fields to generate the summary.")
+    render_summary(project_status)
 
 if project_status == "Red 🔴":
     st.write("Don't worry it will be fine")
-    project_name = st.text_input('Enter the project name:')
-    executive_summary = st.text_area('Executive Summary:')
-    project_target_date = st.date_input("Target Project Completion Date:")
+    project_name = st.text_input('Enter the project name:', key="project_name")
+    prefill_form(project_name)
+    executive_summary = st.text_area('Executive Summary:', key="executive_summary")
+    project_target_date = st.date_input("Target Project Completion Date:", key="project_target_date")
     project_status_this_week = st.selectbox(
         "What is the status of your project this week?",
-        ("On Track", "At Risk", "Off Track"),
+        WEEKLY_STATUSES,
+        key="project_status_this_week",
     )
-    project_activities_this_week = st.text_area('Project Activities this week:')
-    project_activities_next_week = st.text_area('Project Activities for next week:')
+    project_activities_this_week = st.text_area('Project Activities this week:', key="project_activities_this_week")
+    project_activities_next_week = st.text_area('Project Activities for next week:', key="project_activities_next_week")
     project_primary_red_reason = st.selectbox (
         "What is the primary reason for a Yellow status? : if any doubt please refer to the wiki page : https://w.amazon.com/bin/view/AWS/Teams/Proserve/Delivery/StatusReporting/ ",
-        ("Pre-SOW - Work at risk (WAR)","Scope - ProServe Initiated,Custom solution gap","Customer - Market/business factors","ProServe – Delivery delay","ProServe - Service/ Platform/ Product","ProServe – Budget","ProServe – Consultant Availability/Skill Gap","ProServe - Delivery Quality","ProServe - Work at Risk (WAR)","Customer - Budget Reduction","Customer – Delay/Hold","Customer – Alignment","Customer - Readiness","Customer – Resource Availability/Capacity/Skill Gap","Customer - Required Onboarding/Screening of ProServe Consultants","Customer - Sponsor","Partner – Delivery delay","Partner - Delivery Quality","Partner - Alignment","Partner – Resource Availability/Skill Gap","Contract","Scope - Customer","Security","Third party dependency (ISV, Vendor, SI, Regulator)"),
+        PRIMARY_REASONS,
+        key="reason",
     )
-    project_open_ehi_flags = st.text_area ('Open EHI Flags:')
-    project_margin = st.text_area ('Project Margin:')
-    project_risk = st.text_area ('Project Risk:')
+    project_open_ehi_flags = st.text_area ('Open EHI Flags:', key="project_open_ehi_flags")
+    project_margin = st.text_area ('Project Margin:', key="project_margin")
+    project_risk = st.text_area ('Project Risk:', key="project_risk")
     if st.button('Generate Summary'):
         if project_name and executive_summary and project_activities_this_week and project_activities_next_week:
-            prompt = f"""Human: You are an Engagement manager expert and you have to generate a project status each week based on the project colour. You will use the human input and the expert project management practices to elaborate a get to green path based on the {project_risk} stated
-                
-                
-                If the project status from {project_status} is red, you have to generate the summary of the project using this example: 
-                Red Status Example
-                
-                Project Status: Red
-                
-                Primary Red Status Reason: Scope - Change Request/Creep/Undefined
-                
-
-                Project Status Notes:
-
-                [EXECUTIVE SUMMARY]
-                Customer ABC is migrating its cashless payment and processing platform from Oracle (OCI) to AWS. The platform comprises 100 applications, 500 servers, and 700TB of PostgreSQL databases. This migration allows ABC to meet its business target of closing 2 data centers by December 15, 2023. The data center exit will reduce ABC’s data center expenses by $2M annually. This 16-week Mobilize engagement spans 6 work streams. They are: Landing Zone/Control Tower, Operations, Security, People & Change, Portfolio, and Migration.
-
-                Open EHI Flags: DSR - review with engagement security slated for April 3, 2023. DSR close out date is April 7, 2023.
-
-                Project Margin: ABC has a Project Margin variance of -5 percentage points (50% as sold vs. 45% as delivered). This variance is driven by two roles sold as L5 roles but staffed with L6 consultants. L6 consultants were needed to deliver the customer business outcome.
-
-                SITUATION: ABC is red trending yellow. Schedule is at risk due to ABC experiencing attrition in key roles such as PostgreSQL developers, and database administrators. Continued attrition can impact PostgreSQL code conversion work supporting Oracle Exadata to PostgreSQL modernization and overall migration. Status across the 6 work streams is as follows:
-
-                Landing Zone/Control Tower: The sprint goal is to deploy DNS in the Dev environment and the key deliverable this sprint is the completed deployment of DNS in Dev by April 4, 2023. The goal next sprint is to complete the DNS documentation in Confluence.
-                Operations: The sprint goal is to define the disaster recovery strategy for ABC. The key deliverable is the documentation of the DR strategy in Confluence by April 4, 2023. The focus for next sprint is the implementation of the DR strategy
-                Security: The sprint goal is to create a Runbook for Break Glass and the deliverable is a completed Runbook on confluence by April 4, 2023. The focus for next sprint is to complete the design for incident response.
-                People & Change: The sprint goal is to draft the Cloud Center of Excellence (CCOE) charter. The key deliverable is the first draft of the CCOE charter by April 4, 2023. Next sprint’s goal is to complete the CCOE charter and present for ABC sign off.
-                Portfolio: The goal this sprint is to validate migration list dependencies. The key deliverable is the updated migration plan with dependencies and owners identified by April 4, 2023. Next sprint will focus on finalizing the overall migration plan.
-                Migration: The sprint goal is to resolve errors reported in PostgreSQL import scripts by April 4, 2023. The goal next sprint is to kick off data migration for the Dev environment.
-                IMPACT: If ABC loses one more developer or database administrator, the code conversion work with fall behind by 2 weeks translating to an overall migration schedule delay of 1 month. This will jeopardize ABC’s data center exit timeline.
-
-                GET-TO-GREEN PLAN:
-                Monitor ABC staff attrition trends and discuss how ProServe/partner can assist with staffing needs for ABC
-
-                Owner: EM
-                Status: In progress
-                Target completion date: 06-04-2023
-                DSR Completion
-                Owner: EM
-                Status: In progress
-                Target Completion Date: 07-04-2023
-                Key Risks/Issues:
-
-                Risk (R-001 - open]: Tight migration timeline with little slack in the schedule for delays
-                Mitigation: Continue to inspect sprints across migration program and remediate risks/issues that impact schedule.
-                Owner: IJK (EM)
-                Target Close Date: 15-03-2024
-                Issue (I-002 - open): ABC Staff Attrition
-                Mitigation: Work with ABC to monitor attrition trends. Status for immediate attention. Recommend options for ProServe to help mitigate issues by providing staff to support.
-                Owner: IJK (EM)
-                Target Close Date:15-09-2023
-                [OWNERS]: EFG (EM)
-                [TARGET RESOLUTION DATE]: 07-04-2023
-                TARGET PROJECT COMPLETION DATE: 15-12-2023
-
-                CUSTOMER TEMPERATURE: yellow - the customer is concerned about attrition and unplanned schedule delays. The customer returned a CFF rating of “very satisfied” on March 1, 2023.
-
-                Here are links to the Risk Log and Issue Log
-        Here are the information collected <transcript>{project_name}, {executive_summary}, {project_primary_red_reason}, {project_target_date}, {project_status_this_week}, {project_activities_this_week}, {project_activities_next_week}, {project_risk}, {project_open_ehi_flags}, {project_margin}  </transcript> let's go
-        Assistant:"""
-
-            body = bedrock.generate_body(prompt, params)
-            summary = bedrock.invoke_model(body)
-            st.write("Summary:", summary)
+            record = dict(
+                status=project_status,
+                project_name=project_name,
+                executive_summary=executive_summary,
+                project_target_date=str(project_target_date),
+                project_status_this_week=project_status_this_week,
+                project_activities_this_week=project_activities_this_week,
+                project_activities_next_week=project_activities_next_week,
+                reason=project_primary_red_reason,
+                project_open_ehi_flags=project_open_ehi_flags,
+                project_margin=project_margin,
+                project_risk=project_risk,
+            )
+
+            st.session_state.summary_jobs[project_status] = submit_summary(record, force_regenerate)
         else:
             st.error("Please fill in all the fields to generate the summary.")
+    render_summary(project_status)
+
+# Build the Bedrock client in the background now that the page has rendered
+prewarm_bedrock()
@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Telemetry exporters, both off unless configured
+METRICS_PORT = int(os.environ.get('METRICS_PORT', 0))
+METRICS_LOG_INTERVAL = float(os.environ.get('METRICS_LOG_INTERVAL', 0))
+
+THROTTLING_ERRORS = ('ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException')
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """ Keeps the most recent samples of a metric and reports quantiles """
+
+    def __init__(self, max_samples=2048):
+        """ Creates an empty histogram """
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """ Adds a sample """
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """ Returns the q-quantile of the recent samples, or None if empty """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self):
+        """ Returns count, sum and p50/p95/p99 """
+        result = {'count': self.count, 'sum': round(self.sum, 6)}
+        for q in QUANTILES:
+            result[f'p{int(q * 100)}'] = self.quantile(q)
+        return result
+
+
+class Invocation:
+    """ Measures one Bedrock call; use as a context manager around it """
+
+    def __init__(self, telemetry, model_id, prompt, status):
+        """ Starts the clock for a call """
+        self.telemetry = telemetry
+        status = status.split()[0].lower() if status else 'unknown'
+        self.labels = {'model': model_id, 'status': status}
+        self.prompt_chars = len(prompt)
+        self.start = time.perf_counter()
+        self.first_token_s = None
+        self.input_tokens = None
+        self.output_tokens = None
+        self.retries = 0
+
+    def first_token(self):
+        """ Marks the first byte or token received """
+        if self.first_token_s is None:
+            self.first_token_s = time.perf_counter() - self.start
+
+    def response(self, response):
+        """ Reads retries and token counts from the response metadata """
+        metadata = response.get('ResponseMetadata', {})
+        headers = metadata.get('HTTPHeaders', {})
+        self.retries = metadata.get('RetryAttempts', 0)
+        self.tokens(headers.get('x-amzn-bedrock-input-token-count'),
+                    headers.get('x-amzn-bedrock-output-token-count'))
+
+    def tokens(self, input_tokens, output_tokens):
+        """ Records token counts when Bedrock reports them """
+        if input_tokens is not None:
+            self.input_tokens = int(input_tokens)
+        if output_tokens is not None:
+            self.output_tokens = int(output_tokens)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = 'ok'
+        if exc_type is GeneratorExit:
+            outcome = 'cancelled'
+        elif exc is not None:
+            # botocore errors such as ReadTimeoutError carry response=None
+            code = (getattr(exc, 'response', None) or {}).get('Error', {}).get('Code')
+            outcome = 'throttled' if code in THROTTLING_ERRORS else 'error'
+        self.telemetry.record(self, time.perf_counter() - self.start, outcome)
+        return False
+
+
+class Telemetry:
+    """ Aggregates per-call Bedrock metrics by model and status colour """
+
+    def __init__(self, recent=50):
+        """ Creates empty counters and histograms """
+        self.counters = {}
+        self.histograms = {}
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def track(self, model_id, prompt, status=None):
+        """ Returns an Invocation measuring one call of prompt """
+        return Invocation(self, model_id, prompt, status)
+
+    def record(self, call, latency, outcome):
+        """ Folds a finished call into the aggregates """
+        labels = tuple(sorted({**call.labels, 'outcome': outcome}.items()))
+        entry = {
+            **call.labels,
+            'outcome': outcome,
+            'latency_s': round(latency, 3),
+            'first_token_s': None if call.first_token_s is None else round(call.first_token_s, 3),
+            'prompt_chars': call.prompt_chars,
+            'input_tokens': call.input_tokens,
+            'output_tokens': call.output_tokens,
+            'retries': call.retries,
+            'time': time.time(),
+        }
+        with self._lock:
+            self.recent.append(entry)
+            self._count('bedrock_invocations_total', labels)
+            self._count('bedrock_retries_total', labels, call.retries)
+            if outcome == 'throttled':
+                self._count('bedrock_throttles_total', labels)
+            self._observe('bedrock_latency_seconds', labels, latency)
+            self._observe('bedrock_prompt_chars', labels, call.prompt_chars)
+            if call.first_token_s is not None:
+                self._observe('bedrock_first_token_seconds', labels, call.first_token_s)
+            if call.input_tokens is not None:
+                self._count('bedrock_input_tokens_total', labels, call.input_tokens)
+                self._observe('bedrock_input_tokens', labels, call.input_tokens)
+            if call.output_tokens is not None:
+                self._count('bedrock_output_tokens_total', labels, call.output_tokens)
+                self._observe('bedrock_output_tokens', labels, call.output_tokens)
+
+    def count(self, name, value=1, **labels):
+        """ Adds value to a counter outside of a Bedrock call """
+        with self._lock:
+            self._count(name, tuple(sorted(labels.items())), value)
+
+    def observe(self, name, value, **labels):
+        """ Adds a sample to a histogram outside of a Bedrock call """
+        with self._lock:
+            self._observe(name, tuple(sorted(labels.items())), value)
+
+    def snapshot(self):
+        """ Returns all aggregates as a JSON-serialisable dict """
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, **dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'histograms': [
+                    {'name': name, **dict(labels), **histogram.summary()}
+                    for (name, labels), histogram in sorted(self.histograms.items())
+                ],
+            }
+
+    def render_prometheus(self):
+        """ Returns the aggregates in the Prometheus text exposition format """
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                if f'# TYPE {name} counter' not in lines:
+                    lines.append(f'# TYPE {name} counter')
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if f'# TYPE {name} summary' not in lines:
+                    lines.append(f'# TYPE {name} summary')
+                for q in QUANTILES:
+                    value = histogram.quantile(q)
+                    if value is not None:
+                        lines.append(f'{name}{_format_labels(labels + (("quantile", str(q)),))} {value}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum}')
+        return '\n'.join(lines) + '\n'
+
+    def start_metrics_server(self, port):
+        """ Serves render_prometheus() on http://0.0.0.0:port/metrics """
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                payload = telemetry.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+        return server
+
+    def start_json_logger(self, interval):
+        """ Logs snapshot() as JSON every interval seconds """
+        def log_forever():
+            while True:
+                time.sleep(interval)
+                logger.info("bedrock telemetry %s", json.dumps(self.snapshot()))
+
+        threading.Thread(target=log_forever, name='metrics-logger', daemon=True).start()
+
+    def _count(self, name, labels, value=1):
+        self.counters[(name, labels)] = self.counters.get((name, labels), 0) + value
+
+    def _observe(self, name, labels, value):
+        histogram = self.histograms.get((name, labels))
+        if histogram is None:
+            histogram = self.histograms[(name, labels)] = Histogram()
+        histogram.observe(value)
+
+
+def _format_labels(labels):
+    """ Formats label pairs as {key="value",...} """
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+# Process-wide telemetry, shared by every BedrockWrapper
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+def get_telemetry():
+    """ Returns the shared Telemetry, starting configured exporters on first use """
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                telemetry = Telemetry()
+                if METRICS_PORT:
+                    telemetry.start_metrics_server(METRICS_PORT)
+                if METRICS_LOG_INTERVAL:
+                    telemetry.start_json_logger(METRICS_LOG_INTERVAL)
+                _telemetry = telemetry
+    return _telemetry
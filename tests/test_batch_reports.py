@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_reports
+from batch_reports import TokenBucket, invoke_with_backoff
+
+
+def client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'InvokeModel')
+
+
+class FlakyBedrock:
+    """ Raises the queued errors, then answers """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def invoke_model(self, body, status=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'summary'
+
+
+def test_bucket_paces_calls_after_the_burst():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # Two tokens up front, then four at 20 per second
+    assert time.monotonic() - start >= 0.19
+
+
+@pytest.mark.parametrize('rate', [0, -1])
+def test_bucket_rejects_non_positive_rates(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate)
+
+
+@pytest.mark.parametrize('value', ['0', '-2'])
+def test_arguments_reject_non_positive_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        batch_reports.positive(float)(value)
+    assert batch_reports.positive(int)('3') == 3
+
+
+def test_backoff_retries_throttling(monkeypatch):
+    monkeypatch.setattr(batch_reports.time, 'sleep', lambda seconds: None)
+    bedrock = FlakyBedrock(client_error('ThrottlingException'), client_error('ThrottlingException'))
+    assert invoke_with_backoff(bedrock, '{}') == ('summary', 2)
+    assert bedrock.calls == 3
+
+
+def test_backoff_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(batch_reports.time, 'sleep', lambda seconds: None)
+    bedrock = FlakyBedrock(*[client_error('ThrottlingException')] * 3)
+    with pytest.raises(ClientError):
+        invoke_with_backoff(bedrock, '{}', max_retries=2)
+    assert bedrock.calls == 3
+
+
+def test_backoff_does_not_retry_other_errors(monkeypatch):
+    monkeypatch.setattr(batch_reports.time, 'sleep', lambda seconds: None)
+    bedrock = FlakyBedrock(client_error('ValidationException'))
+    with pytest.raises(ClientError):
+        invoke_with_backoff(bedrock, '{}')
+    assert bedrock.calls == 1
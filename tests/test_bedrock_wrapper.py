@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_runtime import StubBedrockRuntime, install_stub
+from bedrock_wrapper import DELTA_PARAMS
+from model_router import get_router
+
+
+def stream(bedrock, body):
+    chunks = bedrock.invoke_model_stream(body, 'Red 🔴')
+    text = []
+    while True:
+        try:
+            text.append(next(chunks))
+        except StopIteration as stop:
+            return ''.join(text), stop.value
+
+
+def test_stream_returns_the_stop_reason():
+    bedrock = install_stub(StubBedrockRuntime(chunks=3, chunk_text='abc '))
+    body = bedrock.generate_body('Update the report', DELTA_PARAMS)
+    assert stream(bedrock, body) == ('abc abc abc ', 'stop_sequence')
+
+
+def test_router_passes_max_tokens_through():
+    install_stub(StubBedrockRuntime(chunks=3, chunk_text='abc ', stop_reason='max_tokens'))
+    router = get_router()
+    body = router.generate_body('Update the report', DELTA_PARAMS)
+    assert stream(router, body) == ('abc abc abc ', 'max_tokens')
@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generation_jobs import GenerationJob, JobExecutor
+
+
+def test_concurrent_submits_share_one_generation():
+    executor = JobExecutor(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        release.wait(5)
+        yield 'Hello, '
+        yield 'world'
+        return 'Hello, world!'
+
+    first = executor.submit('key', generate)
+    second = executor.submit('key', generate)
+    assert second is first
+    assert executor.inflight() == 1
+    release.set()
+    assert first.wait(5)
+    assert calls == [1]
+    assert first.chunks == ['Hello, ', 'world']
+    assert first.text == 'Hello, world!'
+    executor.shutdown()
+
+
+def test_key_is_released_after_completion():
+    executor = JobExecutor(max_workers=1)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        yield str(len(calls))
+
+    first = executor.submit('key', generate)
+    assert first.wait(5)
+    # The key is released just after the job is marked done
+    deadline = time.monotonic() + 5
+    while executor.inflight() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert executor.inflight() == 0
+    second = executor.submit('key', generate)
+    assert second is not first
+    assert second.wait(5)
+    assert (first.text, second.text) == ('1', '2')
+    executor.shutdown()
+
+
+def test_failure_is_stored_on_the_job():
+    executor = JobExecutor(max_workers=1)
+
+    def generate():
+        yield 'partial'
+        raise RuntimeError('throttled')
+
+    job = executor.submit('key', generate)
+    assert job.wait(5)
+    executor.shutdown()
+    assert isinstance(job.error, RuntimeError)
+    assert job.chunks == ['partial']
+    assert executor.inflight() == 0
+
+
+def test_finished_job_is_done():
+    job = GenerationJob.finished('key', 'cached summary')
+    assert job.done()
+    assert job.text == 'cached summary'
@@ -0,0 +1,135 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_runtime import StubBedrockRuntime, install_stub
+from bedrock_wrapper import PARAMS
+import model_router
+from model_router import DEFAULT_MODEL_ROUTES, ModelRouter
+from response_cache import ResponseCache
+
+
+V2 = 'anthropic.claude-v2'
+INSTANT = 'anthropic.claude-instant-v1'
+
+
+class RoutedRuntime(StubBedrockRuntime):
+    """ Stub runtime whose latency and failures depend on the model called """
+
+    def __init__(self, latency=None, errors=None, **kwargs):
+        super().__init__(chunks=2, chunk_text='ok ', **kwargs)
+        self.model_latency = latency or {}
+        self.errors = errors or {}
+        self.models = []
+
+    def _start(self, model_id):
+        self.models.append(model_id)
+        if model_id in self.errors:
+            code = self.errors[model_id]
+            raise ClientError({'Error': {'Code': code, 'Message': code}}, 'InvokeModel')
+        time.sleep(self.model_latency.get(model_id, 0))
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+def body(prompt='Summarise the week'):
+    return json.dumps({'prompt': prompt, **PARAMS})
+
+
+def test_cache_key_follows_the_route():
+    default = ModelRouter(routes={})
+    rerouted = ModelRouter(routes={'red': ['anthropic.claude-instant-v1']})
+    request = body()
+    assert default.cache_model_id(request, 'Red 🔴') == 'anthropic.claude-v2,anthropic.claude-instant-v1'
+    assert default.cache_model_id(request, 'Green 🟢') == rerouted.cache_model_id(request, 'Green 🟢')
+    assert (ResponseCache.make_key(default.cache_model_id(request, 'Red 🔴'), request, PARAMS)
+            != ResponseCache.make_key(rerouted.cache_model_id(request, 'Red 🔴'), request, PARAMS))
+
+
+def test_limiter_paces_fallback_calls():
+    runtime = RoutedRuntime(errors={V2: 'ThrottlingException'})
+    install_stub(runtime)
+    limiter = CountingLimiter()
+    router = ModelRouter(routes={}, hedging=False, limiter=limiter)
+    assert router.invoke_model(body(), 'Red 🔴') == 'ok ok '
+    assert runtime.models == [V2, INSTANT]
+    assert limiter.acquired == 2
+
+
+def stream(router, status='Red 🔴'):
+    return ''.join(router.invoke_model_stream(body(), status))
+
+
+def test_throttled_primary_falls_back_to_the_next_model():
+    runtime = RoutedRuntime(errors={V2: 'ThrottlingException'})
+    install_stub(runtime)
+    router = ModelRouter(routes={})
+    assert stream(router) == 'ok ok '
+    assert runtime.models == [V2, INSTANT]
+    assert router.answers == {(INSTANT, 'fallback'): 1}
+
+
+def test_primary_answers_without_hedging():
+    runtime = RoutedRuntime()
+    install_stub(runtime)
+    router = ModelRouter(routes={})
+    assert stream(router, 'Green 🟢') == 'ok ok '
+    assert runtime.models == [INSTANT]
+    assert router.answers == {(INSTANT, 'primary'): 1}
+
+
+def test_slow_primary_is_hedged_and_still_observed(monkeypatch):
+    monkeypatch.setitem(model_router.HEDGE_DEFAULT_DELAY, 'stream', 0.05)
+    runtime = RoutedRuntime(latency={V2: 0.3})
+    install_stub(runtime)
+    router = ModelRouter(routes={})
+    assert stream(router) == 'ok ok '
+    assert runtime.models == [V2, INSTANT]
+    assert router.answers == {(INSTANT, 'hedge'): 1}
+    # The cancelled primary records its latency once its first chunk arrives
+    deadline = time.monotonic() + 5
+    while (V2, 'stream') not in router.latencies and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert router.latencies[(V2, 'stream')].quantile(0.5) >= 0.3
+
+
+def test_every_model_failing_raises_the_last_error():
+    install_stub(RoutedRuntime(errors={V2: 'ThrottlingException', INSTANT: 'ValidationException'}))
+    router = ModelRouter(routes={})
+    with pytest.raises(ClientError) as error:
+        stream(router)
+    assert error.value.response['Error']['Code'] == 'ValidationException'
+    with pytest.raises(ClientError):
+        router.invoke_model(body(), 'Red 🔴')
+    assert router.answers == {}
+
+
+def test_route_overrides_merge_into_the_defaults():
+    router = ModelRouter(routes={'red': [INSTANT]})
+    assert router.routes == {**DEFAULT_MODEL_ROUTES, 'red': [INSTANT]}
+    assert router.route(body(), 'Red 🔴') == [INSTANT]
+    assert router.route(body(), 'Purple') == DEFAULT_MODEL_ROUTES['large']
+
+
+def test_large_prompts_use_the_large_route():
+    router = ModelRouter(routes={'large': [V2]}, large_prompt_tokens=100)
+    assert router.route(body('x' * 1000), 'Green 🟢') == [V2]
+    assert router.route(body('x' * 100), 'Green 🟢') == DEFAULT_MODEL_ROUTES['green']
+
+
+@pytest.mark.parametrize('route', [[], [1], 'anthropic.claude-v2', None])
+def test_bad_routes_raise(route):
+    with pytest.raises(ValueError):
+        ModelRouter(routes={'red': route})
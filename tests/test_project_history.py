@@ -0,0 +1,102 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project_history import ProjectHistory, changed_fields, merge_report
+
+PREVIOUS = """Project Status: Red
+Primary Red Status Reason: Customer - Readiness
+Project Status Notes:
+[EXECUTIVE SUMMARY]
+Customer ABC is migrating to AWS.
+Open EHI Flags: DSR review on April 3.
+Project Margin: -5 points
+SITUATION: ABC is red trending yellow.
+Migration: resolve import script errors.
+IMPACT: one more departure delays the migration by 1 month.
+GET-TO-GREEN PLAN:
+Monitor attrition
+Owner: EM
+CUSTOMER TEMPERATURE: yellow"""
+
+
+def test_merge_replaces_mixed_case_field_line():
+    merged = merge_report(PREVIOUS, "Project Margin: -8 points")
+    assert "Project Margin: -8 points" in merged
+    assert "-5 points" not in merged
+    assert merged.count("Project Margin:") == 1
+
+
+def test_merge_field_line_after_heading_is_its_own_section():
+    delta = "SITUATION: ABC is red trending red.\nMigration: blocked on DBAs.\nProject Margin: -8 points"
+    merged = merge_report(PREVIOUS, delta)
+    lines = merged.splitlines()
+    assert "-5 points" not in merged
+    assert lines.index("Project Margin: -8 points") < lines.index("SITUATION: ABC is red trending red.")
+    assert "Migration: resolve import script errors." not in merged
+    assert "Migration: blocked on DBAs." in merged
+
+
+def test_merge_replaces_ehi_flags_and_status_reason():
+    delta = "Primary Red Status Reason: Contract\nOpen EHI Flags: none"
+    merged = merge_report(PREVIOUS, delta)
+    assert "Primary Red Status Reason: Contract" in merged
+    assert "Open EHI Flags: none" in merged
+    assert "Customer - Readiness" not in merged
+    assert "DSR review" not in merged
+
+
+def test_merge_keeps_unchanged_sections_and_order():
+    merged = merge_report(PREVIOUS, "IMPACT: none.")
+    assert merged.splitlines() == PREVIOUS.replace(
+        "IMPACT: one more departure delays the migration by 1 month.", "IMPACT: none."
+    ).splitlines()
+
+
+def test_merge_matches_headings_case_insensitively():
+    merged = merge_report(PREVIOUS, "PROJECT MARGIN: -8 points")
+    assert "-5 points" not in merged
+    assert "PROJECT MARGIN: -8 points" in merged
+
+
+def test_merge_appends_new_sections():
+    merged = merge_report(PREVIOUS, "Intro chatter\nKEY DECISIONS: move cutover")
+    assert merged.endswith("KEY DECISIONS: move cutover")
+    assert "Intro chatter" not in merged
+
+
+def test_merge_without_headings_appends_delta():
+    merged = merge_report(PREVIOUS, "Nothing structured here.")
+    assert merged.startswith(PREVIOUS)
+    assert merged.endswith("Nothing structured here.")
+
+
+def test_truncated_merge_drops_the_partial_last_section():
+    delta = "[EXECUTIVE SUMMARY]\nABC is behind plan.\nSITUATION: ABC is red trending red.\nMigration: blocked on"
+    merged = merge_report(PREVIOUS, delta, complete=False)
+    assert "ABC is behind plan." in merged
+    assert "Customer ABC is migrating to AWS." not in merged
+    assert "SITUATION: ABC is red trending yellow." in merged
+    assert "Migration: resolve import script errors." in merged
+    assert "blocked on" not in merged
+
+
+def test_truncated_merge_of_a_single_section_keeps_last_week():
+    assert merge_report(PREVIOUS, "GET-TO-GREEN PLAN:\nHire two", complete=False) == PREVIOUS
+
+
+def test_changed_fields_ignores_key_fields_and_whitespace():
+    previous = {'project_name': 'ABC', 'status': 'Red', 'project_margin': '-5', 'project_risk': 'attrition'}
+    inputs = {'project_name': 'ABC', 'status': 'Red', 'project_margin': '-8', 'project_risk': 'attrition '}
+    assert changed_fields(previous, inputs) == {'project_margin': '-8'}
+
+
+def test_history_returns_latest_report_before_week():
+    history = ProjectHistory(':memory:')
+    inputs = {'project_name': 'ABC', 'status': 'Red'}
+    history.save('2023-W13', inputs, 'week 13')
+    history.save('2023-W14', inputs, 'week 14')
+    assert history.latest('ABC')['summary'] == 'week 14'
+    assert history.latest('ABC', before_week='2023-W14')['summary'] == 'week 13'
+    assert history.latest('XYZ') is None
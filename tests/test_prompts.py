@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import PROMPT_TOKEN_BUDGET, build_prompt, estimate_tokens, update_prompt
+
+
+def test_update_prompt_keeps_the_whole_previous_report():
+    previous = "[EXECUTIVE SUMMARY]\n" + "Long summary. " * 300 + "\nTARGET PROJECT COMPLETION DATE: 15-12-2023"
+    prompt = update_prompt("Red 🔴", "ABC", previous, {'project_margin': '-8 points ' * 2000})
+    assert previous in prompt
+    assert "Project Margin: -8 points" in prompt
+    assert prompt.count("-8 points") < 2000
+
+
+def test_default_budget_sends_the_compact_example_with_every_section():
+    record = {
+        'status': 'Yellow 🟡',
+        'project_name': 'ABC',
+        'executive_summary': 'Migration of 40 applications to AWS.',
+        'project_activities_this_week': 'Landing zone deployed.',
+        'project_activities_next_week': 'Wave 1 cutover.',
+        'project_risk': 'DBA attrition.',
+        'reason': 'Customer - Readiness',
+    }
+    prompt = build_prompt(record)
+    assert estimate_tokens(prompt) < PROMPT_TOKEN_BUDGET
+    assert 'People & Change' not in prompt
+    for heading in ('[EXECUTIVE SUMMARY]', 'Open EHI Flags:', 'Project Margin:', 'SITUATION:', 'IMPACT:',
+                    'GET-TO-GREEN PLAN:', 'Key Risks/Issues:', 'TARGET PROJECT COMPLETION DATE:',
+                    'CUSTOMER TEMPERATURE:'):
+        assert heading in prompt
+    assert 'Migration of 40 applications to AWS.' in prompt
@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_cache import ResponseCache
+
+
+def rows(cache):
+    return cache._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+def test_key_depends_on_model_body_and_params():
+    key = ResponseCache.make_key('model-a', '{"prompt": "x"}', {'temperature': 0.1})
+    assert key == ResponseCache.make_key('model-a', '{"prompt": "x"}', {'temperature': 0.1})
+    assert key != ResponseCache.make_key('model-b', '{"prompt": "x"}', {'temperature': 0.1})
+    assert key != ResponseCache.make_key('model-a', '{"prompt": "y"}', {'temperature': 0.1})
+    assert key != ResponseCache.make_key('model-a', '{"prompt": "x"}', {'temperature': 0.2})
+
+
+def test_hits_and_misses_are_counted():
+    cache = ResponseCache(':memory:')
+    assert cache.get('a') is None
+    cache.set('a', 'summary')
+    assert cache.get('a') == 'summary'
+    assert cache.stats() == {'hits': 1, 'disk_hits': 0, 'misses': 1, 'entries': 1}
+
+
+def test_lru_evicts_least_recently_used_from_memory():
+    cache = ResponseCache(':memory:', max_entries=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    cache.get('a')
+    cache.set('c', '3')
+    assert list(cache._memory) == ['a', 'c']
+    # The evicted entry is still served from disk
+    assert cache.get('b') == '2'
+    assert cache.disk_hits == 1
+
+
+def test_disk_hit_after_restart(tmp_path):
+    path = str(tmp_path / 'responses.sqlite3')
+    ResponseCache(path).set('a', 'summary')
+    cache = ResponseCache(path)
+    assert cache.get('a') == 'summary'
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = ResponseCache(':memory:', ttl=60)
+    now = 1000.0
+    monkeypatch.setattr('response_cache.time.time', lambda: now)
+    cache.set('a', 'summary')
+    now += 61
+    assert cache.get('a') is None
+    assert cache.misses == 1
+    assert rows(cache) == 0
+
+
+def test_set_prunes_expired_rows(monkeypatch):
+    cache = ResponseCache(':memory:', ttl=60)
+    now = 1000.0
+    monkeypatch.setattr('response_cache.time.time', lambda: now)
+    cache.set('old', 'summary')
+    now += 61
+    cache.set('new', 'summary')
+    assert [r[0] for r in cache._db.execute('SELECT key FROM responses')] == ['new']
+
+
+def test_set_caps_rows_keeping_the_newest(monkeypatch):
+    cache = ResponseCache(':memory:', max_rows=3)
+    now = 1000.0
+    monkeypatch.setattr('response_cache.time.time', lambda: now)
+    for key in 'abcde':
+        now += 1
+        cache.set(key, key)
+    keys = {r[0] for r in cache._db.execute('SELECT key FROM responses')}
+    assert keys == {'c', 'd', 'e'}
@@ -0,0 +1,15 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_runtime import StubBedrockRuntime, install_stub
+from bedrock_wrapper import PARAMS
+
+
+def test_prompt_chars_counts_the_prompt_not_the_body():
+    bedrock = install_stub(StubBedrockRuntime(latency=0, chunk_interval=0))
+    prompt = 'Summarise "ABC"\n' * 10
+    body = bedrock.generate_body(prompt, PARAMS)
+    bedrock.invoke_model(body, 'Red 🔴')
+    assert bedrock.telemetry.recent[-1]['prompt_chars'] == len(prompt)